@@ -1,32 +1,43 @@
-import time 
+import asyncio 
 import json 
-from web3 import Web3 
+from web3 import AsyncWeb3, Web3, WebSocketProvider 
 from dotenv import load_dotenv 
 import os 
  
 # Load Configuration 
 load_dotenv() 
 INFURA_URL = os.getenv("RPC_URL") 
+WSS_URL = os.getenv("WSS_URL") 
 PRIVATE_KEY = os.getenv("PRIVATE_KEY") 
+MY_WALLET = os.getenv("MY_WALLET") 
 TARGET_WALLET = "0xTargetWhaleAddress..." 
  
 web3 = Web3(Web3.HTTPProvider(INFURA_URL)) 
  
+# Local nonce counter, seeded from the node's pending count instead of queried per trade 
+_nonce = None 
+ 
+def sync_nonce(): 
+    global _nonce 
+    _nonce = web3.eth.get_transaction_count(MY_WALLET, "pending") 
+    return _nonce 
+ 
+async def next_nonce(): 
+    # The node lookup is a blocking HTTP call, so keep it off the event loop 
+    if _nonce is None: 
+        await asyncio.to_thread(sync_nonce) 
+    return _nonce 
+ 
 def setup_bot(): 
     if not web3.is_connected(): 
         print("[!] Connection Error: Check RPC URL") 
         return False 
     print(f"[+] Connected to Blockchain. Current Block: {web3.eth.block_number}") 
     print(f"[+] Monitoring Target: {TARGET_WALLET}") 
+    print(f"[+] Starting nonce: {sync_nonce()}") 
     return True 
  
-def scan_mempool(): 
-    print("[*] Scanning mempool for pending transactions...") 
-    # Logic to subscribe to pending tx filter 
-    # This is where the magic happens in the paid version 
-    pass 
- 
-def execute_copy_trade(tx_data): 
+async def execute_copy_trade(tx_data): 
     print(f"[!] Target detected! Action: {tx_data['input'][:10]}...") 
      
     # Constructing transaction 
@@ -35,23 +46,32 @@ def execute_copy_trade(tx_data):
         'value': int(tx_data['value']), 
         'gas': 200000, 
         'gasPrice': web3.to_wei('50', 'gwei'), 
-        'nonce': web3.eth.get_transaction_count(os.getenv("MY_WALLET")), 
+        'nonce': await next_nonce(), 
         'chainId': 1 
     } 
      
     print(f"[+] Front-running transaction prepared. Waiting for signature...") 
-    # sign_and_send(tx) 
  
-def main(): 
+async def watch_mempool(): 
+    # Pending transactions are pushed over the websocket as they hit the node's mempool 
+    async with AsyncWeb3(WebSocketProvider(WSS_URL)) as w3: 
+        subscription_id = await w3.eth.subscribe("newPendingTransactions", True) 
+        print(f"[*] Subscribed to pending transactions ({subscription_id})") 
+ 
+        async for payload in w3.socket.process_subscriptions(): 
+            tx = payload["result"] 
+            if str(tx.get("from", "")).lower() == TARGET_WALLET.lower(): 
+                await execute_copy_trade(tx) 
+ 
+async def main_async(): 
     if setup_bot(): 
-        while True: 
-            try: 
-                # Simulation loop 
-                scan_mempool() 
-                time.sleep(1) 
-            except KeyboardInterrupt: 
-                print("\n[!] Bot stopped.") 
-                break 
+        await watch_mempool() 
+ 
+def main(): 
+    try: 
+        asyncio.run(main_async()) 
+    except KeyboardInterrupt: 
+        print("\n[!] Bot stopped.") 
  
 if __name__ == "__main__": 
     main() 
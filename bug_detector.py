@@ -1,24 +1,173 @@
-import json
 import asyncio
-from typing import List, Dict, Any, Optional, Tuple
-from dataclasses import dataclass, asdict
+from typing import List, Dict, Any, Callable, Deque, Optional, Tuple
+from collections import deque
+from dataclasses import dataclass
 from enum import Enum
 import logging
-from datetime import datetime
+import time
 
+import orjson
 from playwright.async_api import Page
-from supabase import create_client, Client
-import os
-from dotenv import load_dotenv
 
-load_dotenv()
+from db import get_http_client
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_ANON_KEY")
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+BUG_INSERT_BATCH_SIZE = 500
+BUG_QUEUE_MAXSIZE = 2000
+MAX_CAPTURED_EVENTS = 5000
+
+DomFindings = Dict[str, List[Dict[str, Any]]]
+
+BUG_PROBES_JS = """window.__qa = window.__qa || {
+    collectAll: () => {
+        const findings = { brokenImages: [], a11y: [], layout: [], headings: [] };
+        const labelledIds = new Set();
+        const unlabelledInputs = [];
+        const zeroDimensionRecords = [];
+        const NON_RENDERED_TAGS = new Set(['SCRIPT', 'STYLE', 'META', 'LINK', 'HEAD']);
+        const counters = { img: 0, button: 0, input: 0, a: 0 };
+        let hasH1 = false;
+        let lastLevel = 0;
+        let headingIdx = 0;
+
+        const elements = document.querySelectorAll('*');
+        elements.forEach((el, idx) => {
+            const tag = el.tagName;
+
+            switch (tag) {
+                case 'IMG': {
+                    if (!el.complete || el.naturalWidth === 0 || el.naturalHeight === 0) {
+                        findings.brokenImages.push({
+                            src: el.src,
+                            alt: el.alt,
+                            width: el.naturalWidth,
+                            height: el.naturalHeight,
+                            complete: el.complete,
+                            currentSrc: el.currentSrc
+                        });
+                    }
+                    if (!el.alt || el.alt.trim() === '') {
+                        findings.a11y.push({
+                            type: 'missing_alt_text',
+                            element: 'img',
+                            index: counters.img,
+                            html: el.outerHTML.substring(0, 100)
+                        });
+                    }
+                    counters.img++;
+                    break;
+                }
+                case 'BUTTON': {
+                    if (!el.textContent.trim() && !el.getAttribute('aria-label')) {
+                        findings.a11y.push({
+                            type: 'missing_button_text',
+                            element: 'button',
+                            index: counters.button,
+                            html: el.outerHTML.substring(0, 100)
+                        });
+                    }
+                    counters.button++;
+                    break;
+                }
+                case 'A': {
+                    if (!el.textContent.trim() && !el.getAttribute('aria-label')) {
+                        findings.a11y.push({
+                            type: 'missing_link_text',
+                            element: 'a',
+                            index: counters.a,
+                            href: el.href
+                        });
+                    }
+                    counters.a++;
+                    break;
+                }
+                case 'LABEL': {
+                    if (el.htmlFor) {
+                        labelledIds.add(el.htmlFor);
+                    }
+                    break;
+                }
+                case 'H1': case 'H2': case 'H3': case 'H4': case 'H5': case 'H6': {
+                    const currentLevel = parseInt(tag[1]);
+                    if (currentLevel === 1) {
+                        hasH1 = true;
+                    }
+                    if (currentLevel - lastLevel > 1) {
+                        findings.headings.push({
+                            type: 'heading_skip',
+                            from: lastLevel,
+                            to: currentLevel,
+                            index: headingIdx
+                        });
+                    }
+                    lastLevel = currentLevel;
+                    headingIdx++;
+                    break;
+                }
+            }
+
+            if (el.matches('input[type="text"], input[type="email"], textarea')) {
+                if (!el.getAttribute('aria-label')) {
+                    unlabelledInputs.push({ el, index: counters.input });
+                }
+                counters.input++;
+            }
+
+            if (NON_RENDERED_TAGS.has(tag)) {
+                return;
+            }
+
+            const rect = el.getBoundingClientRect();
+
+            if (rect.width === 0 || rect.height === 0) {
+                if (el.children.length > 0) {
+                    const record = {
+                        type: 'zero_dimensions',
+                        tagName: tag,
+                        index: idx,
+                        computed: null
+                    };
+                    findings.layout.push(record);
+                    zeroDimensionRecords.push({ el, record });
+                }
+            }
+
+            if (rect.top < 0 || rect.left < 0) {
+                if (el.clientHeight > 100 && el.clientWidth > 100) {
+                    findings.layout.push({
+                        type: 'off_screen',
+                        tagName: tag,
+                        top: rect.top,
+                        left: rect.left
+                    });
+                }
+            }
+        });
+
+        zeroDimensionRecords.forEach(({ el, record }) => {
+            record.computed = window.getComputedStyle(el).display;
+        });
+
+        unlabelledInputs.forEach(({ el, index }) => {
+            if (!el.id || !labelledIds.has(el.id)) {
+                findings.a11y.push({
+                    type: 'missing_label',
+                    element: 'input',
+                    index: index,
+                    html: el.outerHTML.substring(0, 100)
+                });
+            }
+        });
+
+        if (!hasH1) {
+            findings.headings.unshift({ type: 'no_h1' });
+        }
+
+        return findings;
+    }
+};"""
 
 
 class BugSeverity(str, Enum):
@@ -45,7 +194,7 @@ class BugType(str, Enum):
     JAVASCRIPT_ERROR = "javascript_error"
 
 
-@dataclass
+@dataclass(slots=True)
 class BugReport:
     title: str
     severity: BugSeverity
@@ -59,14 +208,54 @@ class BugReport:
     screenshot_path: Optional[str] = None
 
 
+def bug_to_row(bug: BugReport, project_id: str, execution_id: str) -> Dict[str, Any]:
+    return {
+        "project_id": project_id,
+        "execution_id": execution_id,
+        "title": bug.title,
+        "description": bug.description,
+        "severity": bug.severity.value,
+        "bug_type": bug.bug_type.value,
+        "page_url": bug.page_url,
+        "steps_to_reproduce": orjson.dumps(bug.steps_to_reproduce).decode(),
+        "expected_behavior": bug.expected_behavior,
+        "actual_behavior": bug.actual_behavior,
+        "browser_info": bug.browser_info,
+        "status": "open",
+    }
+
+
+def network_error_severity(status: int) -> BugSeverity:
+    if status >= 500:
+        return BugSeverity.CRITICAL
+    if status == 404:
+        return BugSeverity.HIGH
+    return BugSeverity.MEDIUM
+
+
+async def wait_for_settle(count: Callable[[], int], interval: float = 0.1, max_wait: float = 1.0):
+    # Page event listeners fire asynchronously; wait until the captured count
+    # stops changing between polls, or until max_wait runs out.
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max_wait
+    last_count = -1
+
+    while loop.time() < deadline:
+        current = count()
+        if current == last_count:
+            return
+        last_count = current
+        await asyncio.sleep(interval)
+
+
 class BugDetector:
     def __init__(self, page: Page, base_url: str, execution_id: str):
         self.page = page
         self.base_url = base_url
         self.execution_id = execution_id
         self.bugs: List[BugReport] = []
-        self.console_logs: List[Dict[str, Any]] = []
-        self.network_errors: List[Dict[str, Any]] = []
+        self.console_logs: Deque[Dict[str, Any]] = deque(maxlen=MAX_CAPTURED_EVENTS)
+        self.network_errors: Deque[Dict[str, Any]] = deque(maxlen=MAX_CAPTURED_EVENTS)
 
     async def setup_listeners(self):
         def on_console(msg):
@@ -76,7 +265,7 @@ class BugDetector:
                         "type": msg.type,
                         "text": msg.text,
                         "location": msg.location,
-                        "timestamp": datetime.now().isoformat(),
+                        "timestamp": time.time(),
                     }
                 )
 
@@ -86,27 +275,29 @@ class BugDetector:
                     {
                         "url": response.url,
                         "status": response.status,
-                        "timestamp": datetime.now().isoformat(),
+                        "timestamp": time.time(),
                     }
                 )
 
         self.page.on("console", on_console)
         self.page.on("response", on_response)
+        await self.page.add_init_script(BUG_PROBES_JS)
 
-    async def detect_broken_images(self) -> List[BugReport]:
-        broken_images = await self.page.evaluate(
-            """() => {
-            const images = Array.from(document.querySelectorAll('img'));
-            return images.map(img => ({
-                src: img.src,
-                alt: img.alt,
-                width: img.naturalWidth,
-                height: img.naturalHeight,
-                complete: img.complete,
-                currentSrc: img.currentSrc
-            })).filter(img => !img.complete || img.width === 0 || img.height === 0);
-        }"""
-        )
+    async def collect_dom_findings(self) -> DomFindings:
+        findings = await self.page.evaluate("() => window.__qa ? window.__qa.collectAll() : null")
+        if findings is None:
+            await self.page.add_script_tag(content=BUG_PROBES_JS)
+            findings = await self.page.evaluate("() => window.__qa.collectAll()")
+        return findings
+
+    async def detect_broken_images(self, findings: Optional[DomFindings] = None) -> List[BugReport]:
+        if findings is None:
+            findings = await self.collect_dom_findings()
+        broken_images = findings["brokenImages"]
+
+        page_url = self.page.url
+        browser_info = {"browser": "chromium", "url": page_url}
+        steps = ["Navigate to page", "Observe images"]
 
         bugs = []
         for broken_img in broken_images:
@@ -114,12 +305,12 @@ class BugDetector:
                 title=f"Broken Image: {broken_img['src']}",
                 severity=BugSeverity.MEDIUM,
                 bug_type=BugType.BROKEN_IMAGE,
-                description=f"Image failed to load or has zero dimensions",
-                page_url=self.page.url,
-                steps_to_reproduce=["Navigate to page", "Observe images"],
+                description="Image failed to load or has zero dimensions",
+                page_url=page_url,
+                steps_to_reproduce=steps,
                 expected_behavior="All images should load and display properly",
                 actual_behavior=f"Image at {broken_img['src']} did not load",
-                browser_info={"browser": "chromium", "url": self.page.url},
+                browser_info=browser_info,
                 screenshot_path=None,
             )
             bugs.append(bug)
@@ -127,6 +318,10 @@ class BugDetector:
         return bugs
 
     async def detect_console_errors(self) -> List[BugReport]:
+        page_url = self.page.url
+        base_browser_info = {"browser": "chromium", "url": page_url}
+        steps = ["Navigate to page", "Check browser console"]
+
         bugs = []
 
         for log in self.console_logs:
@@ -140,99 +335,49 @@ class BugDetector:
                 severity=severity,
                 bug_type=BugType.CONSOLE_ERROR,
                 description=f"Console {log['type']} detected during page execution",
-                page_url=self.page.url,
-                steps_to_reproduce=["Navigate to page", "Check browser console"],
+                page_url=page_url,
+                steps_to_reproduce=steps,
                 expected_behavior="No console errors should appear",
                 actual_behavior=log["text"],
-                browser_info={
-                    "browser": "chromium",
-                    "url": self.page.url,
-                    "location": str(log.get("location", {})),
-                },
+                browser_info={**base_browser_info, "location": str(log.get("location", {}))},
             )
             bugs.append(bug)
 
         return bugs
 
     async def detect_network_errors(self) -> List[BugReport]:
+        page_url = self.page.url
+        base_browser_info = {"browser": "chromium"}
+        steps = ["Navigate to page", "Check network tab"]
+
         bugs = []
 
         for error in self.network_errors:
-            severity_map = {400: BugSeverity.MEDIUM, 404: BugSeverity.HIGH, 500: BugSeverity.CRITICAL}
-            severity = severity_map.get(error["status"], BugSeverity.MEDIUM)
+            severity = network_error_severity(error["status"])
 
             bug = BugReport(
                 title=f"Network Error {error['status']}: {error['url']}",
                 severity=severity,
                 bug_type=BugType.NETWORK_ERROR,
                 description=f"Network request returned HTTP {error['status']}",
-                page_url=self.page.url,
-                steps_to_reproduce=["Navigate to page", "Check network tab"],
-                expected_behavior=f"Request should return 2xx status code",
+                page_url=page_url,
+                steps_to_reproduce=steps,
+                expected_behavior="Request should return 2xx status code",
                 actual_behavior=f"Request returned {error['status']} status code",
-                browser_info={"browser": "chromium", "url": error["url"]},
+                browser_info={**base_browser_info, "url": error["url"]},
             )
             bugs.append(bug)
 
         return bugs
 
-    async def detect_accessibility_issues(self) -> List[BugReport]:
-        violations = await self.page.evaluate(
-            """() => {
-            const issues = [];
-
-            const images = document.querySelectorAll('img');
-            images.forEach((img, idx) => {
-                if (!img.alt || img.alt.trim() === '') {
-                    issues.push({
-                        type: 'missing_alt_text',
-                        element: 'img',
-                        index: idx,
-                        html: img.outerHTML.substring(0, 100)
-                    });
-                }
-            });
-
-            const buttons = document.querySelectorAll('button');
-            buttons.forEach((btn, idx) => {
-                if (!btn.textContent.trim() && !btn.getAttribute('aria-label')) {
-                    issues.push({
-                        type: 'missing_button_text',
-                        element: 'button',
-                        index: idx,
-                        html: btn.outerHTML.substring(0, 100)
-                    });
-                }
-            });
-
-            const inputs = document.querySelectorAll('input[type="text"], input[type="email"], textarea');
-            inputs.forEach((input, idx) => {
-                const label = input.id ? document.querySelector(`label[for="${input.id}"]`) : null;
-                if (!label && !input.getAttribute('aria-label')) {
-                    issues.push({
-                        type: 'missing_label',
-                        element: 'input',
-                        index: idx,
-                        html: input.outerHTML.substring(0, 100)
-                    });
-                }
-            });
-
-            const links = document.querySelectorAll('a');
-            links.forEach((link, idx) => {
-                if (!link.textContent.trim() && !link.getAttribute('aria-label')) {
-                    issues.push({
-                        type: 'missing_link_text',
-                        element: 'a',
-                        index: idx,
-                        href: link.href
-                    });
-                }
-            });
+    async def detect_accessibility_issues(self, findings: Optional[DomFindings] = None) -> List[BugReport]:
+        if findings is None:
+            findings = await self.collect_dom_findings()
+        violations = findings["a11y"]
 
-            return issues;
-        }"""
-        )
+        page_url = self.page.url
+        browser_info = {"browser": "chromium", "url": page_url}
+        steps = ["Navigate to page", "Use screen reader"]
 
         bugs = []
         for violation in violations:
@@ -241,51 +386,24 @@ class BugDetector:
                 severity=BugSeverity.MEDIUM,
                 bug_type=BugType.MISSING_ALT_TEXT if violation["type"] == "missing_alt_text" else BugType.MISSING_LABEL,
                 description=f"WCAG violation detected: {violation['type']}",
-                page_url=self.page.url,
-                steps_to_reproduce=["Navigate to page", "Use screen reader"],
+                page_url=page_url,
+                steps_to_reproduce=steps,
                 expected_behavior="Page should be fully accessible",
                 actual_behavior=f"{violation['type']} for element at index {violation.get('index', 'unknown')}",
-                browser_info={"browser": "chromium", "url": self.page.url},
+                browser_info=browser_info,
             )
             bugs.append(bug)
 
         return bugs
 
-    async def detect_layout_issues(self) -> List[BugReport]:
-        issues = await self.page.evaluate(
-            """() => {
-            const problems = [];
-
-            const elements = document.querySelectorAll('*');
-            elements.forEach((el, idx) => {
-                const rect = el.getBoundingClientRect();
-
-                if (rect.width === 0 || rect.height === 0) {
-                    if (el.children.length > 0 && el.tagName !== 'SCRIPT' && el.tagName !== 'STYLE') {
-                        problems.push({
-                            type: 'zero_dimensions',
-                            tagName: el.tagName,
-                            index: idx,
-                            computed: window.getComputedStyle(el).display
-                        });
-                    }
-                }
+    async def detect_layout_issues(self, findings: Optional[DomFindings] = None) -> List[BugReport]:
+        if findings is None:
+            findings = await self.collect_dom_findings()
+        issues = findings["layout"]
 
-                if (rect.top < 0 || rect.left < 0) {
-                    if (el.clientHeight > 100 && el.clientWidth > 100) {
-                        problems.push({
-                            type: 'off_screen',
-                            tagName: el.tagName,
-                            top: rect.top,
-                            left: rect.left
-                        });
-                    }
-                }
-            });
-
-            return problems;
-        }"""
-        )
+        page_url = self.page.url
+        browser_info = {"browser": "chromium", "url": page_url}
+        steps = ["Navigate to page", "Inspect layout"]
 
         bugs = []
         for issue in issues:
@@ -294,44 +412,24 @@ class BugDetector:
                 severity=BugSeverity.LOW,
                 bug_type=BugType.LAYOUT_ISSUE,
                 description=f"Layout problem detected: {issue['type']}",
-                page_url=self.page.url,
-                steps_to_reproduce=["Navigate to page", "Inspect layout"],
+                page_url=page_url,
+                steps_to_reproduce=steps,
                 expected_behavior="All elements should be properly positioned",
                 actual_behavior=f"{issue['type']} for {issue['tagName']} element",
-                browser_info={"browser": "chromium", "url": self.page.url},
+                browser_info=browser_info,
             )
             bugs.append(bug)
 
         return bugs
 
-    async def detect_missing_headings(self) -> List[BugReport]:
-        issues = await self.page.evaluate(
-            """() => {
-            const problems = [];
-
-            if (!document.querySelector('h1')) {
-                problems.push({ type: 'no_h1' });
-            }
-
-            const headings = document.querySelectorAll('h1, h2, h3, h4, h5, h6');
-            let lastLevel = 0;
-
-            headings.forEach((h, idx) => {
-                const currentLevel = parseInt(h.tagName[1]);
-                if (currentLevel - lastLevel > 1) {
-                    problems.push({
-                        type: 'heading_skip',
-                        from: lastLevel,
-                        to: currentLevel,
-                        index: idx
-                    });
-                }
-                lastLevel = currentLevel;
-            });
+    async def detect_missing_headings(self, findings: Optional[DomFindings] = None) -> List[BugReport]:
+        if findings is None:
+            findings = await self.collect_dom_findings()
+        issues = findings["headings"]
 
-            return problems;
-        }"""
-        )
+        page_url = self.page.url
+        browser_info = {"browser": "chromium", "url": page_url}
+        steps = ["Navigate to page", "Check heading hierarchy"]
 
         bugs = []
         for issue in issues:
@@ -340,66 +438,130 @@ class BugDetector:
                 severity=BugSeverity.LOW,
                 bug_type=BugType.MISSING_HEADING,
                 description=f"Heading structure issue: {issue['type']}",
-                page_url=self.page.url,
-                steps_to_reproduce=["Navigate to page", "Check heading hierarchy"],
+                page_url=page_url,
+                steps_to_reproduce=steps,
                 expected_behavior="Page should have proper heading hierarchy",
                 actual_behavior=f"Detected {issue['type']} in heading structure",
-                browser_info={"browser": "chromium", "url": self.page.url},
+                browser_info=browser_info,
             )
             bugs.append(bug)
 
         return bugs
 
-    async def detect_all_bugs(self) -> List[BugReport]:
-        await self.setup_listeners()
-        await self.page.goto(self.base_url, wait_until="networkidle")
-        await asyncio.sleep(2)
+    async def detect_all_bugs(self, project_id: Optional[str] = None) -> List[BugReport]:
+        queue: Optional[asyncio.Queue] = None
+        drainer: Optional[asyncio.Task] = None
+        if project_id is not None:
+            queue = asyncio.Queue(maxsize=BUG_QUEUE_MAXSIZE)
+            drainer = asyncio.create_task(self._drain_bugs_to_database(queue, project_id))
 
         all_bugs = []
 
-        logger.info("Detecting broken images...")
-        all_bugs.extend(await self.detect_broken_images())
+        async def emit(bugs: List[BugReport]):
+            all_bugs.extend(bugs)
+            if queue is not None:
+                for bug in bugs:
+                    await self._enqueue(queue, bug, drainer)
+
+        try:
+            await self.setup_listeners()
+            await self.page.goto(self.base_url, wait_until="networkidle")
+
+            logger.info("Collecting DOM findings...")
+            findings = await self.collect_dom_findings()
+
+            logger.info("Detecting broken images...")
+            await emit(await self.detect_broken_images(findings))
 
-        logger.info("Detecting accessibility issues...")
-        all_bugs.extend(await self.detect_accessibility_issues())
+            logger.info("Detecting accessibility issues...")
+            await emit(await self.detect_accessibility_issues(findings))
 
-        logger.info("Detecting layout issues...")
-        all_bugs.extend(await self.detect_layout_issues())
+            logger.info("Detecting layout issues...")
+            await emit(await self.detect_layout_issues(findings))
 
-        logger.info("Detecting missing headings...")
-        all_bugs.extend(await self.detect_missing_headings())
+            logger.info("Detecting missing headings...")
+            await emit(await self.detect_missing_headings(findings))
 
-        await asyncio.sleep(1)
+            await wait_for_settle(lambda: len(self.console_logs) + len(self.network_errors))
 
-        logger.info("Detecting console errors...")
-        all_bugs.extend(await self.detect_console_errors())
+            logger.info("Detecting console errors...")
+            await emit(await self.detect_console_errors())
 
-        logger.info("Detecting network errors...")
-        all_bugs.extend(await self.detect_network_errors())
+            logger.info("Detecting network errors...")
+            await emit(await self.detect_network_errors())
+        finally:
+            if queue is not None:
+                await self._enqueue(queue, None, drainer)
+                await drainer
 
         return all_bugs
 
+    @staticmethod
+    async def _enqueue(queue: asyncio.Queue, item: Optional[BugReport], drainer: asyncio.Task):
+        # A full queue only empties while the drainer runs; if it has died, raise
+        # its error instead of blocking the producers forever.
+        if drainer.done():
+            drainer.result()
+            raise RuntimeError("Bug drainer stopped before the queue was closed")
+
+        try:
+            queue.put_nowait(item)
+            return
+        except asyncio.QueueFull:
+            pass
+
+        put = asyncio.ensure_future(queue.put(item))
+        await asyncio.wait((put, drainer), return_when=asyncio.FIRST_COMPLETED)
+        if put.done():
+            return
+
+        put.cancel()
+        drainer.result()
+        raise RuntimeError("Bug drainer stopped before the queue was closed")
+
+    async def _drain_bugs_to_database(self, queue: asyncio.Queue, project_id: str):
+        done = False
+        while not done:
+            batch = [await queue.get()]
+            while len(batch) < BUG_INSERT_BATCH_SIZE:
+                try:
+                    batch.append(queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+
+            if batch[-1] is None:
+                batch.pop()
+                done = True
+
+            if batch:
+                await self.save_bugs_to_database(project_id, self.execution_id, batch)
+
     async def save_bugs_to_database(
         self, project_id: str, execution_id: str, bugs: List[BugReport]
     ):
-        for bug in bugs:
+        payloads = [bug_to_row(bug, project_id, execution_id) for bug in bugs]
+
+        client = get_http_client()
+
+        async def insert_chunk(start: int) -> int:
+            chunk = payloads[start:start + BUG_INSERT_BATCH_SIZE]
             try:
-                await supabase.table("bug_reports").insert(
-                    {
-                        "project_id": project_id,
-                        "execution_id": execution_id,
-                        "title": bug.title,
-                        "description": bug.description,
-                        "severity": bug.severity.value,
-                        "bug_type": bug.bug_type.value,
-                        "page_url": bug.page_url,
-                        "steps_to_reproduce": json.dumps(bug.steps_to_reproduce),
-                        "expected_behavior": bug.expected_behavior,
-                        "actual_behavior": bug.actual_behavior,
-                        "browser_info": bug.browser_info,
-                        "status": "open",
-                    }
-                ).execute()
-                logger.info(f"Saved bug: {bug.title}")
+                response = await client.post(
+                    "/bug_reports",
+                    content=orjson.dumps(chunk),
+                    headers={"Prefer": "return=minimal"},
+                )
+                response.raise_for_status()
+                logger.info(f"Saved {len(chunk)} bugs (batch starting at {start})")
+                return len(chunk)
             except Exception as e:
-                logger.error(f"Failed to save bug: {str(e)}")
+                logger.error(f"Failed to save {len(chunk)} bugs (batch starting at {start}): {str(e)}")
+                return 0
+
+        saved = sum(
+            await asyncio.gather(
+                *(insert_chunk(start) for start in range(0, len(payloads), BUG_INSERT_BATCH_SIZE))
+            )
+        )
+
+        logger.info(f"Saved {saved}/{len(payloads)} bugs")
@@ -0,0 +1,86 @@
+import asyncio
+import functools
+from typing import Optional
+
+import asyncpg
+import httpx
+import orjson
+from supabase import create_client, Client
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+SUPABASE_URL = os.getenv("SUPABASE_URL")
+SUPABASE_KEY = os.getenv("SUPABASE_ANON_KEY")
+SUPABASE_DB_URL = os.getenv("SUPABASE_DB_URL")
+
+_http_client: Optional[httpx.AsyncClient] = None
+_pool: Optional[asyncpg.Pool] = None
+_pool_lock = asyncio.Lock()
+
+
+@functools.lru_cache(maxsize=1)
+def get_supabase() -> Client:
+    return create_client(SUPABASE_URL, SUPABASE_KEY)
+
+
+def get_http_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            base_url=f"{SUPABASE_URL}/rest/v1",
+            headers={
+                "apikey": SUPABASE_KEY,
+                "Authorization": f"Bearer {SUPABASE_KEY}",
+                "Content-Type": "application/json",
+            },
+            http2=True,
+            limits=httpx.Limits(max_connections=20),
+        )
+    return _http_client
+
+
+async def close_http_client():
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+async def sb_execute(query):
+    return await asyncio.to_thread(query.execute)
+
+
+async def _init_connection(conn: asyncpg.Connection):
+    for pg_type in ("json", "jsonb"):
+        await conn.set_type_codec(
+            pg_type,
+            encoder=lambda value: orjson.dumps(value).decode(),
+            decoder=orjson.loads,
+            schema="pg_catalog",
+        )
+
+
+async def get_pool() -> asyncpg.Pool:
+    global _pool
+    async with _pool_lock:
+        if _pool is None:
+            if not SUPABASE_DB_URL:
+                raise RuntimeError("SUPABASE_DB_URL is not set")
+            _pool = await asyncpg.create_pool(
+                dsn=SUPABASE_DB_URL,
+                min_size=1,
+                max_size=10,
+                max_inactive_connection_lifetime=300,
+                statement_cache_size=0,
+                init=_init_connection,
+            )
+    return _pool
+
+
+async def close_pool():
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
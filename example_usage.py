@@ -1,5 +1,5 @@
 import asyncio
-import json
+import orjson
 import logging
 from orchestrator import QAOrchestrator
 from report_generator import ReportGenerator, ReportFormat
@@ -8,6 +8,11 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def write_file(path: str, content: str):
+    with open(path, "w") as f:
+        f.write(content)
+
+
 async def example_basic_test_suite():
     orchestrator = QAOrchestrator(user_id="demo-user")
     await orchestrator.initialize()
@@ -26,7 +31,7 @@ async def example_basic_test_suite():
         )
 
         logger.info("Test suite completed:")
-        print(json.dumps(result, indent=2))
+        print(orjson.dumps(result, option=orjson.OPT_INDENT_2, default=str).decode())
 
         return result
 
@@ -34,14 +39,17 @@ async def example_basic_test_suite():
         await orchestrator.cleanup()
 
 
-async def example_generate_reports(execution_id: str, project_id: str):
+async def example_generate_reports(execution_id: str, project_id: str, user_id: str):
     logger.info(f"Generating reports for execution {execution_id}")
 
-    generator = ReportGenerator(execution_id=execution_id, project_id=project_id)
+    generator = ReportGenerator(execution_id=execution_id, project_id=project_id, user_id=user_id)
 
-    json_report = await generator.generate_report(ReportFormat.JSON)
-    html_report = await generator.generate_report(ReportFormat.HTML)
-    markdown_report = await generator.generate_report(ReportFormat.MARKDOWN)
+    reports = await generator.generate_reports(
+        [ReportFormat.JSON, ReportFormat.HTML, ReportFormat.MARKDOWN]
+    )
+    json_report = reports[ReportFormat.JSON]
+    html_report = reports[ReportFormat.HTML]
+    markdown_report = reports[ReportFormat.MARKDOWN]
 
     logger.info("JSON Report generated")
     print("=" * 80)
@@ -50,12 +58,11 @@ async def example_generate_reports(execution_id: str, project_id: str):
     print(json_report[:1000])
     print("\n")
 
-    with open(f"report_{execution_id}.html", "w") as f:
-        f.write(html_report)
+    await asyncio.gather(
+        asyncio.to_thread(write_file, f"report_{execution_id}.html", html_report),
+        asyncio.to_thread(write_file, f"report_{execution_id}.md", markdown_report),
+    )
     logger.info(f"HTML report saved to report_{execution_id}.html")
-
-    with open(f"report_{execution_id}.md", "w") as f:
-        f.write(markdown_report)
     logger.info(f"Markdown report saved to report_{execution_id}.md")
 
 
@@ -74,7 +81,7 @@ async def example_create_schedule():
         logger.info(f"Schedule created: {schedule_id}")
 
         schedules = await orchestrator.list_scheduled_tests("demo-project")
-        logger.info(f"Project schedules: {json.dumps(schedules, indent=2, default=str)}")
+        logger.info(f"Project schedules: {orjson.dumps(schedules, option=orjson.OPT_INDENT_2, default=str).decode()}")
 
         await orchestrator.disable_scheduled_test(schedule_id)
         logger.info(f"Schedule {schedule_id} disabled")
@@ -119,7 +126,7 @@ async def main():
     if execution_id:
         print("\n2. Generating reports...")
         print("-" * 80)
-        await example_generate_reports(execution_id, "demo-project")
+        await example_generate_reports(execution_id, "demo-project", "demo-user")
 
     print("\n3. Creating test schedule...")
     print("-" * 80)
@@ -1,6 +1,6 @@
 import asyncio
 import logging
-import json
+import orjson
 from typing import List, Optional
 from datetime import datetime
 import uuid
@@ -9,12 +9,7 @@ from qa_agent import QAAgent, TestType
 from bug_detector import BugDetector
 from report_generator import ReportGenerator, ReportFormat
 from scheduler import TestScheduler
-
-from supabase import create_client, Client
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
+from db import close_http_client, close_pool, get_pool
 
 logging.basicConfig(
     level=logging.INFO,
@@ -22,10 +17,6 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_ANON_KEY")
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-
 
 class QAOrchestrator:
     def __init__(self, user_id: str):
@@ -35,12 +26,15 @@ class QAOrchestrator:
 
     async def initialize(self):
         logger.info("Initializing QA Orchestrator")
+        await get_pool()
         await self.qa_agent.initialize()
 
     async def cleanup(self):
         logger.info("Cleaning up QA Orchestrator")
         await self.qa_agent.cleanup()
         await self.scheduler.stop()
+        await close_http_client()
+        await close_pool()
 
     async def run_complete_qa_suite(
         self, project_id: str, base_url: str, test_types: Optional[List[str]] = None
@@ -93,33 +87,35 @@ class QAOrchestrator:
     async def _run_bug_detection(self, project_id: str, execution_id: str, base_url: str):
         logger.info(f"Running bug detection for execution {execution_id}")
 
+        context = await self.qa_agent.browser.new_context()
+
         try:
-            context = await self.qa_agent.browser.new_context()
             page = await context.new_page()
 
             bug_detector = BugDetector(page, base_url, execution_id)
 
-            bugs = await bug_detector.detect_all_bugs()
-
-            await bug_detector.save_bugs_to_database(project_id, execution_id, bugs)
-
-            await page.close()
-            await context.close()
+            bugs = await bug_detector.detect_all_bugs(project_id)
 
             logger.info(f"Bug detection completed. Found {len(bugs)} bugs")
 
         except Exception as e:
             logger.error(f"Bug detection failed: {str(e)}")
 
+        finally:
+            await context.close()
+
     async def _generate_reports(self, project_id: str, execution_id: str):
         logger.info(f"Generating reports for execution {execution_id}")
 
         try:
-            generator = ReportGenerator(execution_id, project_id)
+            generator = ReportGenerator(execution_id, project_id, self.user_id)
 
-            json_report = await generator.generate_report(ReportFormat.JSON)
-            html_report = await generator.generate_report(ReportFormat.HTML)
-            markdown_report = await generator.generate_report(ReportFormat.MARKDOWN)
+            reports = await generator.generate_reports(
+                [ReportFormat.JSON, ReportFormat.HTML, ReportFormat.MARKDOWN]
+            )
+            json_report = reports[ReportFormat.JSON]
+            html_report = reports[ReportFormat.HTML]
+            markdown_report = reports[ReportFormat.MARKDOWN]
 
             logger.info(f"Reports generated successfully")
             logger.info(f"JSON Report Preview:\n{json_report[:500]}...")
@@ -164,7 +160,7 @@ async def main():
             base_url="https://example.com",
         )
 
-        print(json.dumps(result, indent=2))
+        print(orjson.dumps(result, option=orjson.OPT_INDENT_2, default=str).decode())
 
     finally:
         await orchestrator.cleanup()
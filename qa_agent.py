@@ -1,27 +1,39 @@
 import asyncio
-import json
+import orjson
 import time
+import uuid
 from datetime import datetime
-from typing import Optional, Dict, List, Any
-from dataclasses import dataclass, asdict
+from typing import Optional, Dict, List, Tuple, Any, AsyncIterator
+from collections import OrderedDict, defaultdict
+from contextlib import asynccontextmanager
+from urllib.parse import urldefrag, urljoin, urlparse
+from dataclasses import dataclass
 from enum import Enum
 import logging
+import os
 from abc import ABC, abstractmethod
 
 import aiohttp
 from playwright.async_api import async_playwright, Page, Browser, BrowserContext
-from supabase import create_client, Client
-import os
-from dotenv import load_dotenv
+from postgrest.types import ReturnMethod
 
-load_dotenv()
+from bug_detector import wait_for_settle
+from db import get_supabase, sb_execute
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_ANON_KEY")
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+INTERACTIVE_SELECTOR = "button, input, a, form, select, textarea"
+LINK_SELECTOR = "a[href]"
+LINK_CHECK_TTL = 3600
+LINK_CHECK_CACHE_SIZE = 10000
+LINK_CHECK_CONCURRENCY = 20
+LINK_CHECK_DOMAIN_GAP = float(os.getenv("LINK_CHECK_DOMAIN_GAP", "0.2"))
+LINK_CHECK_PER_HOST = int(os.getenv("LINK_CHECK_PER_HOST", "4"))
+LINK_CHECK_SCHEMES = {"http", "https"}
+HEAD_UNSUPPORTED_STATUSES = {403, 405, 501}
+HEAD_UNSUPPORTED_TTL = 3600
+LINK_CHECK_TIMEOUT = 5
 
 
 class TestType(str, Enum):
@@ -49,7 +61,7 @@ class TestStatus(str, Enum):
     SKIPPED = "skipped"
 
 
-@dataclass
+@dataclass(slots=True)
 class TestResult:
     status: TestStatus
     message: str
@@ -58,7 +70,7 @@ class TestResult:
     error: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class BugReport:
     title: str
     severity: BugSeverity
@@ -71,6 +83,192 @@ class BugReport:
     browser_info: Dict[str, str]
 
 
+QA_PROBES_JS = """window.__qaProbes = window.__qaProbes || {
+    performance: () => {
+        const perf = performance.getEntriesByType('navigation')[0];
+        const paint = performance.getEntriesByType('paint');
+        const resources = performance.getEntriesByType('resource');
+        return {
+            domInteractive: perf.domInteractive,
+            domContentLoaded: perf.domContentLoadedEventEnd,
+            loadEventEnd: perf.loadEventEnd,
+            fcpTime: paint.find(p => p.name === 'first-contentful-paint')?.startTime || 0,
+            lcpTime: 0,
+            resources: {
+                count: resources.length,
+                totalSize: resources.reduce((sum, r) => sum + (r.transferSize || 0), 0) / 1024,
+                failedRequests: resources.filter(r => !r.responseEnd).length
+            }
+        };
+    },
+
+    accessibility: () => {
+        const violations = [];
+
+        const images = document.querySelectorAll('img');
+        images.forEach(img => {
+            if (!img.alt || img.alt.trim() === '') {
+                violations.push({type: 'missing_alt_text', element: 'img'});
+            }
+        });
+
+        const buttons = document.querySelectorAll('button');
+        buttons.forEach(btn => {
+            if (!btn.textContent.trim() && !btn.getAttribute('aria-label')) {
+                violations.push({type: 'missing_button_label', element: 'button'});
+            }
+        });
+
+        const labels = document.querySelectorAll('input');
+        labels.forEach(input => {
+            if (!input.id || !document.querySelector(`label[for="${input.id}"]`)) {
+                violations.push({type: 'missing_form_label', element: 'input'});
+            }
+        });
+
+        const headings = document.querySelectorAll('h1, h2, h3, h4, h5, h6');
+        let lastLevel = 0;
+        headings.forEach(h => {
+            const currentLevel = parseInt(h.tagName[1]);
+            if (currentLevel - lastLevel > 1) {
+                violations.push({type: 'heading_level_skip', element: h.tagName});
+            }
+            lastLevel = currentLevel;
+        });
+
+        return violations;
+    }
+};"""
+
+
+class LinkCheckCache:
+    def __init__(self, ttl: int = LINK_CHECK_TTL, maxsize: int = LINK_CHECK_CACHE_SIZE):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._d: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get(self, url: str) -> Optional[int]:
+        entry = self._d.get(url)
+        if entry is None:
+            return None
+
+        status, ts = entry
+        if time.time() - ts > self.ttl:
+            del self._d[url]
+            return None
+
+        self._d.move_to_end(url)
+        return status
+
+    def set(self, url: str, status: int):
+        self._d[url] = (status, time.time())
+        self._d.move_to_end(url)
+        if len(self._d) > self.maxsize:
+            self._d.popitem(last=False)
+
+
+link_check_cache = LinkCheckCache()
+# Host -> status it answered HEAD with; expires so a transient 405/501 isn't permanent
+head_unsupported_hosts = LinkCheckCache(ttl=HEAD_UNSUPPORTED_TTL)
+
+_link_session: Optional[aiohttp.ClientSession] = None
+
+
+def get_link_session() -> aiohttp.ClientSession:
+    global _link_session
+    if _link_session is None or _link_session.closed:
+        _link_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=100,
+                limit_per_host=10,
+                ttl_dns_cache=300,
+                use_dns_cache=True,
+                enable_cleanup_closed=True,
+            )
+        )
+    return _link_session
+
+
+async def close_link_session():
+    global _link_session
+    if _link_session is not None:
+        await _link_session.close()
+        _link_session = None
+
+
+class DomainRateLimiter:
+    def __init__(
+        self,
+        min_gap: float = LINK_CHECK_DOMAIN_GAP,
+        per_host: int = LINK_CHECK_PER_HOST,
+        concurrency: int = LINK_CHECK_CONCURRENCY,
+    ):
+        self.min_gap = min_gap
+        self._global = asyncio.Semaphore(concurrency)
+        self._in_flight: Dict[str, asyncio.Semaphore] = defaultdict(lambda: asyncio.Semaphore(per_host))
+        self._last_sent: Dict[str, float] = {}
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[None]:
+        domain = urlparse(url).netloc
+        async with self._in_flight[domain]:
+            await self._acquire(domain)
+            try:
+                yield
+            finally:
+                self._global.release()
+
+    def _gap_remaining(self, domain: str) -> float:
+        return self._last_sent.get(domain, float("-inf")) + self.min_gap - time.monotonic()
+
+    async def _acquire(self, domain: str):
+        # Sleep off the host gap without holding the global semaphore, then check it
+        # again once a global slot is ours, so the gap is measured between actual sends.
+        while True:
+            delay = self._gap_remaining(domain)
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+
+            await self._global.acquire()
+            if self._gap_remaining(domain) <= 0:
+                self._last_sent[domain] = time.monotonic()
+                return
+            self._global.release()
+
+
+def collect_link_urls(hrefs: List[Optional[str]], base_url: str) -> Dict[str, str]:
+    # Absolute URL without fragment -> first href that resolved to it
+    checked_urls: Dict[str, str] = {}
+    for href in hrefs:
+        if not href or href.startswith("#"):
+            continue
+
+        url = urldefrag(urljoin(base_url, href))[0]
+
+        if urlparse(url).scheme not in LINK_CHECK_SCHEMES or url in checked_urls:
+            continue
+
+        checked_urls[url] = href
+
+    return checked_urls
+
+
+async def fetch_link_status(session: aiohttp.ClientSession, url: str) -> int:
+    host = urlparse(url).netloc
+    timeout = aiohttp.ClientTimeout(total=LINK_CHECK_TIMEOUT)
+
+    if head_unsupported_hosts.get(host) is None:
+        async with session.head(url, timeout=timeout, allow_redirects=True) as resp:
+            if resp.status not in HEAD_UNSUPPORTED_STATUSES:
+                return resp.status
+        logger.info(f"{host} rejects HEAD ({resp.status}), using ranged GET")
+        head_unsupported_hosts.set(host, resp.status)
+
+    async with session.get(url, headers={"Range": "bytes=0-0"}, timeout=timeout, allow_redirects=True) as resp:
+        return resp.status
+
+
 class BaseTestRunner(ABC):
     def __init__(self, page: Page, base_url: str):
         self.page = page
@@ -81,6 +279,13 @@ class BaseTestRunner(ABC):
     async def run(self) -> TestResult:
         pass
 
+    async def call_probe(self, name: str) -> Any:
+        result = await self.page.evaluate(f"() => window.__qaProbes ? window.__qaProbes.{name}() : null")
+        if result is None:
+            await self.page.add_script_tag(content=QA_PROBES_JS)
+            result = await self.page.evaluate(f"() => window.__qaProbes.{name}()")
+        return result
+
     def add_bug(self, bug: BugReport):
         self.bugs.append(bug)
 
@@ -89,22 +294,24 @@ class FunctionalTestRunner(BaseTestRunner):
     async def run(self) -> TestResult:
         try:
             start = time.time()
-            await self.page.goto(self.base_url, wait_until="networkidle")
 
-            elements_found = await self.page.query_selector_all("*")
-            interactive_elements = await self.page.query_selector_all(
-                "button, input, a, form, select, textarea"
+            counts = await self.page.evaluate(
+                """(selector) => ({
+                total: document.getElementsByTagName('*').length,
+                interactive: document.querySelectorAll(selector).length,
+            })""",
+                INTERACTIVE_SELECTOR,
             )
 
             duration = int((time.time() - start) * 1000)
 
             return TestResult(
                 status=TestStatus.PASSED,
-                message=f"Functional test completed. Found {len(interactive_elements)} interactive elements.",
+                message=f"Functional test completed. Found {counts['interactive']} interactive elements.",
                 duration_ms=duration,
                 details={
-                    "total_elements": len(elements_found),
-                    "interactive_elements": len(interactive_elements),
+                    "total_elements": counts["total"],
+                    "interactive_elements": counts["interactive"],
                     "page_loaded": True,
                 },
             )
@@ -122,30 +329,8 @@ class PerformanceTestRunner(BaseTestRunner):
         try:
             start = time.time()
 
-            metrics = await self.page.evaluate(
-                """() => {
-                const perf = performance.getEntriesByType('navigation')[0];
-                const paint = performance.getEntriesByType('paint');
-                return {
-                    domInteractive: perf.domInteractive,
-                    domContentLoaded: perf.domContentLoadedEventEnd,
-                    loadEventEnd: perf.loadEventEnd,
-                    fcpTime: paint.find(p => p.name === 'first-contentful-paint')?.startTime || 0,
-                    lcpTime: 0
-                };
-            }"""
-            )
-
-            resource_timing = await self.page.evaluate(
-                """() => {
-                const resources = performance.getEntriesByType('resource');
-                return {
-                    count: resources.length,
-                    totalSize: resources.reduce((sum, r) => sum + (r.transferSize || 0), 0) / 1024,
-                    failedRequests: resources.filter(r => !r.responseEnd).length
-                };
-            }"""
-            )
+            metrics = await self.call_probe("performance")
+            resource_timing = metrics["resources"]
 
             duration = int((time.time() - start) * 1000)
 
@@ -177,44 +362,7 @@ class AccessibilityTestRunner(BaseTestRunner):
         try:
             start = time.time()
 
-            violations = await self.page.evaluate(
-                """() => {
-                const violations = [];
-
-                const images = document.querySelectorAll('img');
-                images.forEach(img => {
-                    if (!img.alt || img.alt.trim() === '') {
-                        violations.push({type: 'missing_alt_text', element: 'img'});
-                    }
-                });
-
-                const buttons = document.querySelectorAll('button');
-                buttons.forEach(btn => {
-                    if (!btn.textContent.trim() && !btn.getAttribute('aria-label')) {
-                        violations.push({type: 'missing_button_label', element: 'button'});
-                    }
-                });
-
-                const labels = document.querySelectorAll('input');
-                labels.forEach(input => {
-                    if (!input.id || !document.querySelector(`label[for="${input.id}"]`)) {
-                        violations.push({type: 'missing_form_label', element: 'input'});
-                    }
-                });
-
-                const headings = document.querySelectorAll('h1, h2, h3, h4, h5, h6');
-                let lastLevel = 0;
-                headings.forEach(h => {
-                    const currentLevel = parseInt(h.tagName[1]);
-                    if (currentLevel - lastLevel > 1) {
-                        violations.push({type: 'heading_level_skip', element: h.tagName});
-                    }
-                    lastLevel = currentLevel;
-                });
-
-                return violations;
-            }"""
-            )
+            violations = await self.call_probe("accessibility")
 
             duration = int((time.time() - start) * 1000)
 
@@ -240,34 +388,38 @@ class AccessibilityTestRunner(BaseTestRunner):
 
 
 class BrokenLinksTestRunner(BaseTestRunner):
+    async def _check_link(
+        self, session: aiohttp.ClientSession, rate_limiter: DomainRateLimiter, href: str, url: str
+    ) -> Tuple[str, str, Optional[int], Optional[str]]:
+        async with rate_limiter.slot(url):
+            try:
+                return href, url, await fetch_link_status(session, url), None
+            except Exception as e:
+                return href, url, None, str(e)
+
     async def run(self) -> TestResult:
         try:
             start = time.time()
 
-            links = await self.page.query_selector_all("a[href]")
-            broken_links = []
-            checked_urls = set()
-
-            async with aiohttp.ClientSession() as session:
-                for link in links:
-                    href = await link.get_attribute("href")
-
-                    if not href or href.startswith("#") or href.startswith("javascript:"):
-                        continue
-
-                    if href in checked_urls:
-                        continue
-
-                    checked_urls.add(href)
+            hrefs: List[str] = await self.page.eval_on_selector_all(
+                LINK_SELECTOR, "els => els.map(e => e.getAttribute('href'))"
+            )
+            checked_urls = collect_link_urls(hrefs, self.base_url)
+            pending = [(href, url) for url, href in checked_urls.items() if link_check_cache.get(url) is None]
 
-                    url = href if href.startswith("http") else self.base_url.rstrip("/") + "/" + href.lstrip("/")
+            rate_limiter = DomainRateLimiter()
+            session = get_link_session()
+            broken_links = []
+            checks = [self._check_link(session, rate_limiter, href, url) for href, url in pending]
+            for coro in asyncio.as_completed(checks):
+                href, url, status, error = await coro
 
-                    try:
-                        async with session.head(url, timeout=aiohttp.ClientTimeout(total=5), allow_redirects=True) as resp:
-                            if resp.status >= 400:
-                                broken_links.append({"url": href, "status": resp.status})
-                    except Exception as e:
-                        broken_links.append({"url": href, "error": str(e)})
+                if error is not None:
+                    broken_links.append({"url": href, "error": error})
+                elif status >= 400:
+                    broken_links.append({"url": href, "status": status})
+                else:
+                    link_check_cache.set(url, status)
 
             duration = int((time.time() - start) * 1000)
 
@@ -297,34 +449,25 @@ class FormValidationTestRunner(BaseTestRunner):
         try:
             start = time.time()
 
-            forms = await self.page.query_selector_all("form")
-            form_issues = []
-
-            for idx, form in enumerate(forms):
-                inputs = await form.query_selector_all("input, textarea, select")
+            form_issues = await self.page.evaluate(
+                """() => {
+                const issues = [];
 
-                has_submit = await form.query_selector("button[type='submit'], input[type='submit']")
+                document.querySelectorAll('form').forEach((form, idx) => {
+                    if (!form.querySelector("button[type='submit'], input[type='submit']")) {
+                        issues.push({form_index: idx, issue: 'No submit button found'});
+                    }
 
-                if not has_submit:
-                    form_issues.append(
-                        {
-                            "form_index": idx,
-                            "issue": "No submit button found",
+                    form.querySelectorAll('input, textarea, select').forEach(input => {
+                        if (input.required && !input.name) {
+                            issues.push({form_index: idx, issue: `Required ${input.type} input missing name attribute`});
                         }
-                    )
-
-                for input_elem in inputs:
-                    input_type = await input_elem.get_attribute("type")
-                    input_name = await input_elem.get_attribute("name")
-                    is_required = await input_elem.get_attribute("required")
+                    });
+                });
 
-                    if is_required and not input_name:
-                        form_issues.append(
-                            {
-                                "form_index": idx,
-                                "issue": f"Required {input_type} input missing name attribute",
-                            }
-                        )
+                return issues;
+            }"""
+            )
 
             duration = int((time.time() - start) * 1000)
 
@@ -370,7 +513,7 @@ class ConsoleErrorDetector(BaseTestRunner):
             self.page.on("pageerror", handle_exception)
 
             await self.page.goto(self.base_url, wait_until="networkidle")
-            await asyncio.sleep(2)
+            await wait_for_settle(lambda: len(console_errors) + len(exceptions), interval=0.2, max_wait=2.0)
 
             duration = int((time.time() - start) * 1000)
 
@@ -397,18 +540,34 @@ class ConsoleErrorDetector(BaseTestRunner):
             )
 
 
+TEST_RUNNERS = {
+    TestType.FUNCTIONAL: FunctionalTestRunner,
+    TestType.PERFORMANCE: PerformanceTestRunner,
+    TestType.ACCESSIBILITY: AccessibilityTestRunner,
+    TestType.BROKEN_LINKS: BrokenLinksTestRunner,
+    TestType.FORM_VALIDATION: FormValidationTestRunner,
+}
+
+
 class QAAgent:
     def __init__(self, user_id: str):
         self.user_id = user_id
         self.browser: Optional[Browser] = None
-        self.context: Optional[BrowserContext] = None
 
     async def initialize(self):
         playwright = await async_playwright().start()
         self.browser = await playwright.chromium.launch()
         logger.info("Browser initialized")
 
+    async def new_context(self) -> BrowserContext:
+        # One context per run keeps cookies, storage and service workers from one
+        # site out of the next project's tests; the browser itself is shared.
+        context = await self.browser.new_context()
+        await context.add_init_script(QA_PROBES_JS)
+        return context
+
     async def cleanup(self):
+        await close_link_session()
         if self.browser:
             await self.browser.close()
         logger.info("Browser closed")
@@ -416,7 +575,7 @@ class QAAgent:
     async def create_test_execution(
         self, project_id: str, execution_id: str
     ) -> Dict[str, Any]:
-        return {
+        execution = {
             "id": execution_id,
             "project_id": project_id,
             "status": "running",
@@ -426,38 +585,64 @@ class QAAgent:
             "warnings": 0,
         }
 
+        await sb_execute(
+            get_supabase().table("test_executions").insert(
+                execution, returning=ReturnMethod.minimal
+            )
+        )
+
+        return execution
+
+    async def _run_runner(self, test_type: TestType, page: Page, base_url: str) -> TestResult:
+        try:
+            logger.info(f"Running {test_type.value} test")
+            return await TEST_RUNNERS[test_type](page, base_url).run()
+        except Exception as e:
+            return TestResult(
+                status=TestStatus.FAILED,
+                message=f"{test_type.value} test failed",
+                duration_ms=0,
+                error=str(e),
+            )
+
     async def run_test_suite(
         self, project_id: str, base_url: str, test_types: List[TestType]
     ) -> Dict[str, Any]:
-        execution_id = str(__import__("uuid").uuid4())
+        execution_id = str(uuid.uuid4())
+        execution = await self.create_test_execution(project_id, execution_id)
 
         try:
-            self.context = await self.browser.new_context()
-            page = await self.context.new_page()
-
-            execution = await self.create_test_execution(project_id, execution_id)
-
-            test_runners = {
-                TestType.FUNCTIONAL: FunctionalTestRunner(page, base_url),
-                TestType.PERFORMANCE: PerformanceTestRunner(page, base_url),
-                TestType.ACCESSIBILITY: AccessibilityTestRunner(page, base_url),
-                TestType.BROKEN_LINKS: BrokenLinksTestRunner(page, base_url),
-                TestType.FORM_VALIDATION: FormValidationTestRunner(page, base_url),
-            }
-
-            results = []
-
-            for test_type in test_types:
-                if test_type in test_runners:
-                    logger.info(f"Running {test_type.value} test")
-                    runner = test_runners[test_type]
-
-                    result = await runner.run()
-                    results.append(
-                        {
-                            "test_type": test_type.value,
-                            "result": asdict(result),
-                        }
+            selected_types = [t for t in test_types if t in TEST_RUNNERS]
+
+            # The runners only read the loaded page, so they share one page that is
+            # navigated once, with nothing else loading, before any of them start.
+            # This keeps PerformanceTestRunner's navigation timings unskewed.
+            context = await self.new_context()
+            tasks = []
+
+            try:
+                page = await context.new_page()
+                await page.goto(base_url, wait_until="networkidle")
+                tasks = [
+                    asyncio.create_task(self._run_runner(test_type, page, base_url))
+                    for test_type in selected_types
+                ]
+
+                for next_result in asyncio.as_completed(tasks):
+                    result = await next_result
+
+                    await sb_execute(
+                        get_supabase().table("test_results").insert(
+                            {
+                                "execution_id": execution_id,
+                                "scenario_id": str(uuid.uuid4()),
+                                "status": result.status,
+                                "error_message": result.error,
+                                "duration_ms": result.duration_ms,
+                                "details": result.details,
+                            },
+                            returning=ReturnMethod.minimal,
+                        )
                     )
 
                     if result.status == TestStatus.PASSED:
@@ -468,53 +653,53 @@ class QAAgent:
                         execution["warnings"] += 1
 
                     execution["total_tests"] += 1
-
-            await page.close()
-            await self.context.close()
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                await context.close()
 
             execution["status"] = "completed"
 
-            await supabase.table("test_executions").insert(
-                {
-                    "id": execution_id,
-                    "project_id": project_id,
-                    "status": execution["status"],
-                    "total_tests": execution["total_tests"],
-                    "passed": execution["passed"],
-                    "failed": execution["failed"],
-                    "warnings": execution["warnings"],
-                }
-            ).execute()
-
-            for idx, test_result in enumerate(results):
-                await supabase.table("test_results").insert(
+            await sb_execute(
+                get_supabase().table("test_executions").update(
                     {
-                        "execution_id": execution_id,
-                        "scenario_id": str(__import__("uuid").uuid4()),
-                        "status": test_result["result"]["status"],
-                        "error_message": test_result["result"]["error"],
-                        "duration_ms": test_result["result"]["duration_ms"],
-                        "details": test_result["result"]["details"],
-                    }
-                ).execute()
+                        "status": execution["status"],
+                        "total_tests": execution["total_tests"],
+                        "passed": execution["passed"],
+                        "failed": execution["failed"],
+                        "warnings": execution["warnings"],
+                    },
+                    returning=ReturnMethod.minimal,
+                ).eq("id", execution_id)
+            )
 
             logger.info(f"Test execution {execution_id} completed")
             return execution
 
+        except asyncio.CancelledError:
+            # Shutdown cancelled the suite; don't leave its row stuck at "running".
+            logger.error(f"Test execution {execution_id} cancelled")
+            await self._mark_execution_failed(execution)
+            raise
         except Exception as e:
             logger.error(f"Test execution failed: {str(e)}")
-            await supabase.table("test_executions").insert(
+            await self._mark_execution_failed(execution)
+            raise
+
+    async def _mark_execution_failed(self, execution: Dict[str, Any]):
+        await sb_execute(
+            get_supabase().table("test_executions").update(
                 {
-                    "id": execution_id,
-                    "project_id": project_id,
                     "status": "failed",
-                    "total_tests": 0,
-                    "passed": 0,
-                    "failed": 1,
-                    "warnings": 0,
-                }
-            ).execute()
-            raise
+                    "total_tests": execution["total_tests"],
+                    "passed": execution["passed"],
+                    "failed": execution["failed"] + 1,
+                    "warnings": execution["warnings"],
+                },
+                returning=ReturnMethod.minimal,
+            ).eq("id", execution["id"])
+        )
 
 
 async def main():
@@ -532,7 +717,7 @@ async def main():
                 TestType.BROKEN_LINKS,
             ],
         )
-        print(json.dumps(result, indent=2))
+        print(orjson.dumps(result, option=orjson.OPT_INDENT_2, default=str).decode())
     finally:
         await agent.cleanup()
 
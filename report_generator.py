@@ -1,22 +1,77 @@
-import json
-from typing import List, Dict, Any, Optional
+import orjson
+from typing import List, Dict, Any, Iterator, Optional
 from datetime import datetime
+from collections import Counter, OrderedDict
+from itertools import islice
 from dataclasses import asdict
+import functools
 import logging
+import os
+import time
 from enum import Enum
 
-from supabase import create_client, Client
-import os
-from dotenv import load_dotenv
+import asyncpg
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template
 
-load_dotenv()
+from db import get_pool
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_ANON_KEY")
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+SEVERITY_LEVELS = ("critical", "high", "medium", "low", "info")
+TERMINAL_STATUSES = {"completed", "failed"}
+REPORT_CACHE_TTL = 3600
+REPORT_CACHE_SIZE = 256
+HTML_BUG_LIMIT = 20
+
+EXECUTION_BUNDLE_SQL = """
+WITH owned AS (
+    SELECT e.*
+    FROM test_executions e
+    JOIN test_projects p ON p.id = e.project_id
+    WHERE e.id = $1 AND p.owner_id = $2
+)
+SELECT jsonb_build_object(
+    'execution', (SELECT to_jsonb(o) FROM owned o),
+    'results', (SELECT coalesce(jsonb_agg(r), '[]'::jsonb) FROM test_results r WHERE r.execution_id IN (SELECT id FROM owned)),
+    'bugs', (SELECT coalesce(jsonb_agg(b), '[]'::jsonb) FROM bug_reports b WHERE b.execution_id IN (SELECT id FROM owned)),
+    'perf', (SELECT coalesce(jsonb_agg(m), '[]'::jsonb) FROM performance_metrics m WHERE m.execution_id IN (SELECT id FROM owned))
+)
+"""
+
+REPORT_VERSION_SQL = """
+SELECT e.status, count(b.id), max(b.updated_at)
+FROM test_executions e
+JOIN test_projects p ON p.id = e.project_id
+LEFT JOIN bug_reports b ON b.execution_id = e.id
+WHERE e.id = $1 AND p.owner_id = $2
+GROUP BY e.status
+"""
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+TEMPLATE_CACHE_DIR = os.getenv("REPORT_TEMPLATE_CACHE_DIR")
+
+
+def _bytecode_cache() -> Optional[FileSystemBytecodeCache]:
+    # Without REPORT_TEMPLATE_CACHE_DIR, Jinja picks a per-user directory under the system temp dir.
+    try:
+        if TEMPLATE_CACHE_DIR:
+            os.makedirs(TEMPLATE_CACHE_DIR, exist_ok=True)
+            return FileSystemBytecodeCache(TEMPLATE_CACHE_DIR)
+        return FileSystemBytecodeCache()
+    except (OSError, RuntimeError) as e:
+        logger.warning(f"Template bytecode cache disabled: {str(e)}")
+        return None
+
+
+@functools.lru_cache(maxsize=1)
+def get_html_template() -> Template:
+    env = Environment(
+        loader=FileSystemLoader(TEMPLATES_DIR),
+        autoescape=True,
+        bytecode_cache=_bytecode_cache(),
+    )
+    return env.get_template("report.html.j2")
 
 
 class ReportFormat(str, Enum):
@@ -26,63 +81,63 @@ class ReportFormat(str, Enum):
     PDF = "pdf"
 
 
+class ReportCache:
+    def __init__(self, ttl: int = REPORT_CACHE_TTL, maxsize: int = REPORT_CACHE_SIZE):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._d: "OrderedDict[tuple, tuple]" = OrderedDict()
+
+    def get(self, execution_id: str, format: ReportFormat, version: Optional[tuple] = None) -> Optional[str]:
+        key = (execution_id, format)
+        entry = self._d.get(key)
+        if entry is None:
+            return None
+
+        report, cached_version, ts = entry
+        if time.time() - ts > self.ttl or cached_version != version:
+            del self._d[key]
+            return None
+
+        self._d.move_to_end(key)
+        return report
+
+    def set(self, execution_id: str, format: ReportFormat, report: str, version: Optional[tuple] = None):
+        key = (execution_id, format)
+        self._d[key] = (report, version, time.time())
+        self._d.move_to_end(key)
+        if len(self._d) > self.maxsize:
+            self._d.popitem(last=False)
+
+
+report_cache = ReportCache()
+
+
 class ReportGenerator:
-    def __init__(self, execution_id: str, project_id: str):
+    def __init__(self, execution_id: str, project_id: str, user_id: str):
         self.execution_id = execution_id
         self.project_id = project_id
+        self.user_id = user_id
         self.execution_data = None
         self.test_results = []
         self.bug_reports = []
         self.performance_metrics = []
 
-    async def load_execution_data(self):
-        try:
-            response = await supabase.table("test_executions").select("*").eq("id", self.execution_id).single().execute()
-            self.execution_data = response.data
-        except Exception as e:
-            logger.error(f"Failed to load execution data: {str(e)}")
-
-    async def load_test_results(self):
-        try:
-            response = (
-                await supabase.table("test_results")
-                .select("*")
-                .eq("execution_id", self.execution_id)
-                .execute()
-            )
-            self.test_results = response.data or []
-        except Exception as e:
-            logger.error(f"Failed to load test results: {str(e)}")
-
-    async def load_bug_reports(self):
-        try:
-            response = (
-                await supabase.table("bug_reports")
-                .select("*")
-                .eq("execution_id", self.execution_id)
-                .execute()
-            )
-            self.bug_reports = response.data or []
-        except Exception as e:
-            logger.error(f"Failed to load bug reports: {str(e)}")
-
-    async def load_performance_metrics(self):
+    async def load_all_data(self):
         try:
-            response = (
-                await supabase.table("performance_metrics")
-                .select("*")
-                .eq("execution_id", self.execution_id)
-                .execute()
-            )
-            self.performance_metrics = response.data or []
+            pool = await get_pool()
+            try:
+                bundle = await pool.fetchval("SELECT get_execution_bundle($1, $2)", self.execution_id, self.user_id)
+            except asyncpg.UndefinedFunctionError:
+                logger.warning("get_execution_bundle is not installed, using inline bundle query")
+                bundle = await pool.fetchval(EXECUTION_BUNDLE_SQL, self.execution_id, self.user_id)
+
+            bundle = bundle or {}
+            self.execution_data = bundle.get("execution")
+            self.test_results = bundle.get("results") or []
+            self.bug_reports = bundle.get("bugs") or []
+            self.performance_metrics = bundle.get("perf") or []
         except Exception as e:
-            logger.error(f"Failed to load performance metrics: {str(e)}")
-
-    async def load_all_data(self):
-        await self.load_execution_data()
-        await self.load_test_results()
-        await self.load_bug_reports()
-        await self.load_performance_metrics()
+            logger.error(f"Failed to load execution bundle: {str(e)}")
 
     def generate_summary(self) -> Dict[str, Any]:
         if not self.execution_data:
@@ -104,23 +159,18 @@ class ReportGenerator:
         }
 
     def generate_bug_summary(self) -> Dict[str, Any]:
-        severity_counts = {
-            "critical": len([b for b in self.bug_reports if b.get("severity") == "critical"]),
-            "high": len([b for b in self.bug_reports if b.get("severity") == "high"]),
-            "medium": len([b for b in self.bug_reports if b.get("severity") == "medium"]),
-            "low": len([b for b in self.bug_reports if b.get("severity") == "low"]),
-            "info": len([b for b in self.bug_reports if b.get("severity") == "info"]),
-        }
-
-        bug_type_counts = {}
+        severities = Counter()
+        bug_type_counts = Counter()
         for bug in self.bug_reports:
-            bug_type = bug.get("bug_type", "unknown")
-            bug_type_counts[bug_type] = bug_type_counts.get(bug_type, 0) + 1
+            severities[bug.get("severity")] += 1
+            bug_type_counts[bug.get("bug_type") or "unknown"] += 1
+
+        severity_counts = {severity: severities[severity] for severity in SEVERITY_LEVELS}
 
         return {
             "total_bugs": len(self.bug_reports),
             "severity_breakdown": severity_counts,
-            "type_breakdown": bug_type_counts,
+            "type_breakdown": dict(bug_type_counts),
             "bugs": self.bug_reports,
         }
 
@@ -128,12 +178,14 @@ class ReportGenerator:
         if not self.performance_metrics:
             return {"total_pages_tested": 0, "metrics": []}
 
-        avg_load_time = sum(m.get("page_load_time_ms", 0) for m in self.performance_metrics) / len(
-            self.performance_metrics
-        )
-        avg_fcp = sum(m.get("first_contentful_paint_ms", 0) for m in self.performance_metrics) / len(
-            self.performance_metrics
-        )
+        total_load_time = 0
+        total_fcp = 0
+        for metric in self.performance_metrics:
+            total_load_time += metric.get("page_load_time_ms", 0)
+            total_fcp += metric.get("first_contentful_paint_ms", 0)
+
+        avg_load_time = total_load_time / len(self.performance_metrics)
+        avg_fcp = total_fcp / len(self.performance_metrics)
 
         return {
             "total_pages_tested": len(self.performance_metrics),
@@ -151,195 +203,52 @@ class ReportGenerator:
             "generated_at": datetime.now().isoformat(),
         }
 
-        return json.dumps(report, indent=2, default=str)
+        return orjson.dumps(report, option=orjson.OPT_INDENT_2, default=str).decode()
 
-    def generate_html_report(self) -> str:
-        summary = self.generate_summary()
+    def _html_context(self) -> Dict[str, Any]:
         bug_summary = self.generate_bug_summary()
-        perf_summary = self.generate_performance_summary()
-
-        html = f"""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>QA Test Report</title>
-    <style>
-        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
-            background: #f5f7fa;
-            padding: 20px;
-            color: #333;
-        }}
-        .container {{ max-width: 1200px; margin: 0 auto; background: white; border-radius: 8px; box-shadow: 0 2px 8px rgba(0,0,0,0.1); padding: 40px; }}
-        h1 {{ color: #1a1a1a; margin-bottom: 30px; font-size: 28px; }}
-        h2 {{ color: #2c3e50; margin-top: 30px; margin-bottom: 15px; font-size: 22px; border-bottom: 2px solid #e1e8ed; padding-bottom: 10px; }}
-        h3 {{ color: #34495e; margin-top: 20px; margin-bottom: 10px; font-size: 16px; }}
-        .summary-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 20px;
-            margin-bottom: 30px;
-        }}
-        .stat-card {{
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 20px;
-            border-radius: 8px;
-            text-align: center;
-        }}
-        .stat-card.passed {{ background: linear-gradient(135deg, #11998e 0%, #38ef7d 100%); }}
-        .stat-card.failed {{ background: linear-gradient(135deg, #ee0979 0%, #ff6a00 100%); }}
-        .stat-card.warnings {{ background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%); }}
-        .stat-value {{ font-size: 32px; font-weight: bold; margin-bottom: 5px; }}
-        .stat-label {{ font-size: 14px; opacity: 0.9; }}
-        .bug-list {{ margin-top: 20px; }}
-        .bug-item {{
-            background: #f8f9fa;
-            border-left: 4px solid #e1e8ed;
-            padding: 15px;
-            margin-bottom: 12px;
-            border-radius: 4px;
-            transition: all 0.3s ease;
-        }}
-        .bug-item:hover {{ box-shadow: 0 2px 8px rgba(0,0,0,0.1); }}
-        .bug-item.critical {{ border-left-color: #e74c3c; }}
-        .bug-item.high {{ border-left-color: #e67e22; }}
-        .bug-item.medium {{ border-left-color: #f39c12; }}
-        .bug-item.low {{ border-left-color: #3498db; }}
-        .bug-title {{ font-weight: 600; color: #2c3e50; margin-bottom: 8px; }}
-        .bug-severity {{
-            display: inline-block;
-            padding: 4px 8px;
-            border-radius: 3px;
-            font-size: 12px;
-            font-weight: 600;
-            margin-top: 8px;
-        }}
-        .bug-severity.critical {{ background: #e74c3c; color: white; }}
-        .bug-severity.high {{ background: #e67e22; color: white; }}
-        .bug-severity.medium {{ background: #f39c12; color: white; }}
-        .bug-severity.low {{ background: #3498db; color: white; }}
-        .performance-table {{
-            width: 100%;
-            border-collapse: collapse;
-            margin-top: 15px;
-        }}
-        .performance-table th {{
-            background: #ecf0f1;
-            padding: 12px;
-            text-align: left;
-            font-weight: 600;
-            border-bottom: 2px solid #bdc3c7;
-        }}
-        .performance-table td {{
-            padding: 12px;
-            border-bottom: 1px solid #ecf0f1;
-        }}
-        .footer {{
-            margin-top: 40px;
-            padding-top: 20px;
-            border-top: 1px solid #ecf0f1;
-            font-size: 12px;
-            color: #7f8c8d;
-            text-align: center;
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>QA Test Execution Report</h1>
-
-        <h2>Execution Summary</h2>
-        <div class="summary-grid">
-            <div class="stat-card">
-                <div class="stat-value">{summary.get('total_tests', 0)}</div>
-                <div class="stat-label">Total Tests</div>
-            </div>
-            <div class="stat-card passed">
-                <div class="stat-value">{summary.get('passed', 0)}</div>
-                <div class="stat-label">Passed</div>
-            </div>
-            <div class="stat-card failed">
-                <div class="stat-value">{summary.get('failed', 0)}</div>
-                <div class="stat-label">Failed</div>
-            </div>
-            <div class="stat-card warnings">
-                <div class="stat-value">{summary.get('warnings', 0)}</div>
-                <div class="stat-label">Warnings</div>
-            </div>
-        </div>
-        <p><strong>Pass Rate:</strong> {summary.get('pass_rate', 0):.1f}%</p>
-
-        <h2>Bug Report Summary</h2>
-        <p><strong>Total Bugs Found:</strong> {bug_summary.get('total_bugs', 0)}</p>
-        <div class="summary-grid">
-            <div style="background: #e74c3c; color: white; padding: 15px; border-radius: 4px; text-align: center;">
-                <div style="font-size: 24px; font-weight: bold;">{bug_summary.get('severity_breakdown', {}).get('critical', 0)}</div>
-                <div>Critical</div>
-            </div>
-            <div style="background: #e67e22; color: white; padding: 15px; border-radius: 4px; text-align: center;">
-                <div style="font-size: 24px; font-weight: bold;">{bug_summary.get('severity_breakdown', {}).get('high', 0)}</div>
-                <div>High</div>
-            </div>
-            <div style="background: #f39c12; color: white; padding: 15px; border-radius: 4px; text-align: center;">
-                <div style="font-size: 24px; font-weight: bold;">{bug_summary.get('severity_breakdown', {}).get('medium', 0)}</div>
-                <div>Medium</div>
-            </div>
-            <div style="background: #3498db; color: white; padding: 15px; border-radius: 4px; text-align: center;">
-                <div style="font-size: 24px; font-weight: bold;">{bug_summary.get('severity_breakdown', {}).get('low', 0)}</div>
-                <div>Low</div>
-            </div>
-        </div>
-
-        <h2>Bugs Detected</h2>
-        <div class="bug-list">
-"""
 
-        for bug in bug_summary.get("bugs", [])[:20]:
-            html += f"""
-            <div class="bug-item {bug.get('severity', 'info')}">
-                <div class="bug-title">{bug.get('title', 'Unknown')}</div>
-                <div>{bug.get('description', '')}</div>
-                <span class="bug-severity {bug.get('severity', 'info')}">{bug.get('severity', 'info').upper()}</span>
-            </div>
-"""
-
-        html += """
-        </div>
-
-        <h2>Performance Metrics</h2>
-"""
+        return {
+            "summary": self.generate_summary(),
+            "bug_summary": bug_summary,
+            "bugs": islice(bug_summary.get("bugs") or (), HTML_BUG_LIMIT),
+            "perf": self.generate_performance_summary(),
+            "exec_id": self.execution_id,
+            "now": datetime.now(),
+        }
 
-        if perf_summary.get("total_pages_tested", 0) > 0:
-            html += f"""
-        <p><strong>Pages Tested:</strong> {perf_summary.get('total_pages_tested', 0)}</p>
-        <p><strong>Average Load Time:</strong> {perf_summary.get('average_load_time_ms', 0)}ms</p>
-        <p><strong>Average FCP:</strong> {perf_summary.get('average_fcp_ms', 0)}ms</p>
-"""
-        else:
-            html += "<p>No performance metrics available.</p>"
-
-        html += f"""
-        <div class="footer">
-            <p>Report generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
-            <p>Execution ID: {self.execution_id}</p>
-        </div>
-    </div>
-</body>
-</html>
-"""
+    def generate_html_report(self) -> str:
+        return get_html_template().render(self._html_context())
 
-        return html
+    def stream_json(self) -> Iterator[bytes]:
+        bug_summary = self.generate_bug_summary()
+        bug_totals = {key: value for key, value in bug_summary.items() if key != "bugs"}
+
+        yield b'{"execution_summary":' + orjson.dumps(self.generate_summary(), default=str)
+        yield b',"bug_summary":' + orjson.dumps(bug_totals, option=orjson.OPT_NON_STR_KEYS, default=str)[:-1] + b',"bugs":'
+        yield from self._stream_array(bug_summary["bugs"])
+        yield b'},"performance_summary":' + orjson.dumps(self.generate_performance_summary(), default=str)
+        yield b',"test_results":'
+        yield from self._stream_array(self.test_results)
+        yield b',"generated_at":' + orjson.dumps(datetime.now()) + b"}"
+
+    @staticmethod
+    def _stream_array(rows: List[Dict[str, Any]]) -> Iterator[bytes]:
+        yield b"["
+        for idx, row in enumerate(rows):
+            yield (b"," if idx else b"") + orjson.dumps(row, default=str)
+        yield b"]"
+
+    def stream_html(self) -> Iterator[str]:
+        yield from get_html_template().generate(self._html_context())
 
     def generate_markdown_report(self) -> str:
         summary = self.generate_summary()
         bug_summary = self.generate_bug_summary()
         perf_summary = self.generate_performance_summary()
 
-        md = f"""# QA Test Execution Report
+        parts = [
+            f"""# QA Test Execution Report
 
 ## Execution Summary
 
@@ -367,9 +276,11 @@ class ReportGenerator:
 ## Bugs Detected
 
 """
+        ]
 
         for bug in bug_summary.get("bugs", []):
-            md += f"""### {bug.get('title', 'Unknown')}
+            parts.append(
+                f"""### {bug.get('title', 'Unknown')}
 
 **Severity:** {bug.get('severity', 'info').upper()}
 **Type:** {bug.get('bug_type', 'unknown')}
@@ -378,8 +289,10 @@ class ReportGenerator:
 {bug.get('description', '')}
 
 """
+            )
 
-        md += f"""
+        parts.append(
+            f"""
 ## Performance Metrics
 
 - **Pages Tested:** {perf_summary.get('total_pages_tested', 0)}
@@ -390,12 +303,11 @@ class ReportGenerator:
 
 *Report generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*
 """
+        )
 
-        return md
-
-    async def generate_report(self, format: ReportFormat = ReportFormat.JSON) -> str:
-        await self.load_all_data()
+        return "".join(parts)
 
+    def render(self, format: ReportFormat = ReportFormat.JSON) -> str:
         if format == ReportFormat.JSON:
             return self.generate_json_report()
         elif format == ReportFormat.HTML:
@@ -404,3 +316,41 @@ class ReportGenerator:
             return self.generate_markdown_report()
         else:
             return self.generate_json_report()
+
+    async def generate_report(self, format: ReportFormat = ReportFormat.JSON) -> str:
+        reports = await self.generate_reports([format])
+        return reports[format]
+
+    async def load_report_version(self) -> Optional[tuple]:
+        # Executions are marked completed before bug detection writes its rows,
+        # so the cache is keyed on the bug rows too, not just the status.
+        try:
+            pool = await get_pool()
+            row = await pool.fetchrow(REPORT_VERSION_SQL, self.execution_id, self.user_id)
+        except Exception as e:
+            logger.error(f"Failed to load report version: {str(e)}")
+            return None
+
+        return tuple(row) if row else None
+
+    async def generate_reports(self, formats: List[ReportFormat]) -> Dict[ReportFormat, str]:
+        version = await self.load_report_version()
+
+        reports = {}
+        if version is not None:
+            for format in formats:
+                cached = report_cache.get(self.execution_id, format, version)
+                if cached is not None:
+                    reports[format] = cached
+
+        missing = [format for format in formats if format not in reports]
+        if missing:
+            await self.load_all_data()
+            cacheable = version is not None and version[0] in TERMINAL_STATUSES
+
+            for format in missing:
+                reports[format] = self.render(format)
+                if cacheable:
+                    report_cache.set(self.execution_id, format, reports[format], version)
+
+        return {format: reports[format] for format in formats}
@@ -1,23 +1,26 @@
 import asyncio
+import heapq
 import logging
-from typing import Optional, Dict, List, Callable
-from datetime import datetime, timedelta
+import time
+from typing import Optional, Dict, List, Set, Callable, Tuple
+from datetime import datetime, timedelta, timezone
 from dataclasses import dataclass
 import json
 
-from supabase import create_client, Client
-import os
-from dotenv import load_dotenv
+from supabase import Client
 from croniter import croniter
 
-load_dotenv()
+from db import get_supabase, get_pool, sb_execute
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_ANON_KEY")
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+supabase: Client = get_supabase()
+
+RETRY_DELAY = 60
+MAX_CONCURRENT_TASKS = 8
+FLUSH_INTERVAL = 5
+STOP_TIMEOUT = 30
 
 
 @dataclass
@@ -29,6 +32,7 @@ class ScheduledTask:
     enabled: bool
     last_run: Optional[datetime]
     next_run: Optional[datetime]
+    base_url: Optional[str] = None
 
 
 class TestScheduler:
@@ -36,67 +40,112 @@ class TestScheduler:
         self.tasks: Dict[str, ScheduledTask] = {}
         self.running = False
         self.test_runner_callback: Optional[Callable] = None
+        self._heap: List[Tuple[float, str]] = []
+        self._scheduled_at: Dict[str, float] = {}
+        self._wakeup = asyncio.Event()
+        self._semaphore = asyncio.Semaphore(MAX_CONCURRENT_TASKS)
+        self._running_tasks: Set[asyncio.Task] = set()
+        self._cron: Dict[str, Tuple[str, croniter]] = {}
+        self._pending_updates: Dict[str, Tuple[datetime, datetime]] = {}
+        self._flusher: Optional[asyncio.Task] = None
 
     async def load_schedules_from_database(self):
         try:
-            response = await supabase.table("test_schedules").select("*").eq("enabled", True).execute()
-            schedules = response.data or []
+            pool = await get_pool()
+            schedules = await pool.fetch(
+                """
+                SELECT s.id, s.project_id, s.name, s.cron_expression, s.enabled, s.last_run, s.next_run, p.base_url
+                FROM test_schedules s
+                JOIN test_projects p ON p.id = s.project_id
+                WHERE s.enabled = true
+                """
+            )
 
             for schedule in schedules:
                 task = ScheduledTask(
-                    id=schedule["id"],
-                    project_id=schedule["project_id"],
+                    id=str(schedule["id"]),
+                    project_id=str(schedule["project_id"]),
                     name=schedule["name"],
                     cron_expression=schedule["cron_expression"],
                     enabled=schedule["enabled"],
-                    last_run=datetime.fromisoformat(schedule["last_run"]) if schedule.get("last_run") else None,
-                    next_run=datetime.fromisoformat(schedule["next_run"]) if schedule.get("next_run") else None,
+                    last_run=schedule["last_run"],
+                    next_run=schedule["next_run"],
+                    base_url=schedule["base_url"],
                 )
 
-                self.tasks[schedule["id"]] = task
+                self.tasks[task.id] = task
+                self._schedule(task)
                 logger.info(f"Loaded schedule: {schedule['name']}")
 
         except Exception as e:
             logger.error(f"Failed to load schedules: {str(e)}")
 
-    async def calculate_next_run(self, task: ScheduledTask) -> datetime:
+    def _get_cron(self, task: ScheduledTask) -> croniter:
+        cached = self._cron.get(task.id)
+        if cached is None or cached[0] != task.cron_expression:
+            cached = self._cron[task.id] = (task.cron_expression, croniter(task.cron_expression, datetime.now(timezone.utc)))
+        return cached[1]
+
+    def calculate_next_run(self, task: ScheduledTask) -> datetime:
         try:
-            cron = croniter(task.cron_expression, datetime.now())
-            next_run = datetime.fromtimestamp(cron.get_next(float))
+            now = datetime.now(timezone.utc)
+            cron = self._get_cron(task)
+            next_run = cron.get_next(datetime)
+
+            if next_run <= now:
+                cron.set_current(now, force=True)
+                next_run = cron.get_next(datetime)
+
             return next_run
         except Exception as e:
             logger.error(f"Failed to calculate next run for task {task.id}: {str(e)}")
-            return datetime.now() + timedelta(hours=1)
+            return datetime.now(timezone.utc) + timedelta(hours=1)
 
     async def update_schedule_in_database(
         self, task_id: str, last_run: datetime, next_run: datetime
     ):
+        self._pending_updates[task_id] = (last_run, next_run)
+
+    async def flush_schedule_updates(self):
+        if not self._pending_updates:
+            return
+
+        pending, self._pending_updates = self._pending_updates, {}
         try:
-            await supabase.table("test_schedules").update(
-                {
-                    "last_run": last_run.isoformat(),
-                    "next_run": next_run.isoformat(),
-                    "updated_at": datetime.now().isoformat(),
-                }
-            ).eq("id", task_id).execute()
+            pool = await get_pool()
+            await pool.executemany(
+                "UPDATE test_schedules SET last_run = $1, next_run = $2, updated_at = now() WHERE id = $3",
+                [(last_run, next_run, task_id) for task_id, (last_run, next_run) in pending.items()],
+            )
         except Exception as e:
-            logger.error(f"Failed to update schedule {task_id}: {str(e)}")
+            logger.error(f"Failed to flush {len(pending)} schedule updates: {str(e)}")
+            for task_id, update in pending.items():
+                self._pending_updates.setdefault(task_id, update)
+
+    async def _flush_loop(self):
+        while self.running:
+            await asyncio.sleep(FLUSH_INTERVAL)
+            await self.flush_schedule_updates()
 
     async def execute_task(self, task: ScheduledTask):
         logger.info(f"Executing scheduled task: {task.name}")
 
         if self.test_runner_callback:
             try:
-                project = await supabase.table("test_projects").select("*").eq("id", task.project_id).single().execute()
+                if task.base_url is None:
+                    project = await sb_execute(
+                        supabase.table("test_projects").select("base_url").eq("id", task.project_id).single()
+                    )
+                    task.base_url = project.data["base_url"]
 
                 await self.test_runner_callback(
                     project_id=task.project_id,
-                    base_url=project.data["base_url"],
+                    base_url=task.base_url,
                     test_types=["functional", "performance", "accessibility", "broken_links"],
                 )
 
-                last_run = datetime.now()
-                next_run = await self.calculate_next_run(task)
+                last_run = datetime.now(timezone.utc)
+                next_run = self.calculate_next_run(task)
 
                 await self.update_schedule_in_database(task.id, last_run, next_run)
 
@@ -108,50 +157,117 @@ class TestScheduler:
             except Exception as e:
                 logger.error(f"Failed to execute task {task.name}: {str(e)}")
 
+    def _schedule(self, task: ScheduledTask, when: Optional[float] = None):
+        if when is None:
+            when = task.next_run.timestamp() if task.next_run else time.time()
+
+        self._scheduled_at[task.id] = when
+        heapq.heappush(self._heap, (when, task.id))
+        self._wakeup.set()
+
+    async def _sleep(self, delay: Optional[float]):
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _run_task(self, task: ScheduledTask):
+        previous_run = task.next_run
+        async with self._semaphore:
+            await self.execute_task(task)
+
+        if task.next_run is previous_run:
+            self._schedule(task, time.time() + RETRY_DELAY)
+        else:
+            self._schedule(task)
+
     async def scheduler_loop(self):
         logger.info("Test scheduler started")
         await self.load_schedules_from_database()
 
         while self.running:
-            now = datetime.now()
+            self._wakeup.clear()
 
-            for task_id, task in self.tasks.items():
-                if not task.enabled:
-                    continue
+            if not self._heap:
+                await self._sleep(None)
+                continue
 
-                next_run = task.next_run or now
+            when, task_id = self._heap[0]
+            delay = when - time.time()
+            if delay > 0:
+                await self._sleep(delay)
+                continue
 
-                if next_run <= now:
-                    await self.execute_task(task)
+            heapq.heappop(self._heap)
+            task = self.tasks.get(task_id)
+            if task is None or not task.enabled or self._scheduled_at.get(task_id) != when:
+                continue
 
-            await asyncio.sleep(60)
+            del self._scheduled_at[task_id]
+            running = asyncio.create_task(self._run_task(task))
+            self._running_tasks.add(running)
+            running.add_done_callback(self._running_tasks.discard)
 
     async def start(self, test_runner_callback: Callable):
+        await get_pool()
         self.running = True
         self.test_runner_callback = test_runner_callback
+        self._flusher = asyncio.create_task(self._flush_loop())
         await self.scheduler_loop()
 
     async def stop(self):
         self.running = False
+        self._wakeup.set()
+
+        # Give in-flight runs STOP_TIMEOUT seconds to finish so their schedule updates
+        # land in the final flush. Runs still going after that are cancelled; the
+        # suite marks its execution failed on cancellation, and no update is recorded
+        # for it, so the schedule stays due and runs again on the next start.
+        if self._running_tasks:
+            _, stragglers = await asyncio.wait(set(self._running_tasks), timeout=STOP_TIMEOUT)
+            for task in stragglers:
+                task.cancel()
+            await asyncio.gather(*stragglers, return_exceptions=True)
+
+        if self._flusher is not None:
+            self._flusher.cancel()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+
+        await self.flush_schedule_updates()
         logger.info("Test scheduler stopped")
 
     async def add_schedule(
         self, project_id: str, name: str, cron_expression: str
     ) -> Optional[str]:
         try:
-            result = await supabase.table("test_schedules").insert(
-                {
-                    "project_id": project_id,
-                    "name": name,
-                    "cron_expression": cron_expression,
-                    "enabled": True,
-                    "next_run": (datetime.now() + timedelta(minutes=5)).isoformat(),
-                }
-            ).execute()
+            next_run = croniter(cron_expression, datetime.now(timezone.utc)).get_next(datetime)
+
+            result = await sb_execute(
+                supabase.table("test_schedules").insert(
+                    {
+                        "project_id": project_id,
+                        "name": name,
+                        "cron_expression": cron_expression,
+                        "enabled": True,
+                        "next_run": next_run.isoformat(),
+                    }
+                )
+            )
 
             if result.data:
                 schedule_id = result.data[0]["id"]
-                logger.info(f"Created schedule: {name} (ID: {schedule_id})")
+                self.tasks[schedule_id] = ScheduledTask(
+                    id=schedule_id,
+                    project_id=project_id,
+                    name=name,
+                    cron_expression=cron_expression,
+                    enabled=True,
+                    last_run=None,
+                    next_run=next_run,
+                )
+                self._schedule(self.tasks[schedule_id])
+                logger.info(f"Created schedule: {name} (ID: {schedule_id}, next run: {next_run})")
                 return schedule_id
         except Exception as e:
             logger.error(f"Failed to add schedule: {str(e)}")
@@ -160,12 +276,15 @@ class TestScheduler:
 
     async def disable_schedule(self, schedule_id: str):
         try:
-            await supabase.table("test_schedules").update(
-                {"enabled": False, "updated_at": datetime.now().isoformat()}
-            ).eq("id", schedule_id).execute()
+            await sb_execute(
+                supabase.table("test_schedules").update(
+                    {"enabled": False, "updated_at": datetime.now(timezone.utc).isoformat()}
+                ).eq("id", schedule_id)
+            )
 
             if schedule_id in self.tasks:
                 self.tasks[schedule_id].enabled = False
+                self._scheduled_at.pop(schedule_id, None)
 
             logger.info(f"Disabled schedule: {schedule_id}")
         except Exception as e:
@@ -173,7 +292,7 @@ class TestScheduler:
 
     async def get_schedules(self, project_id: str) -> List[Dict]:
         try:
-            response = await supabase.table("test_schedules").select("*").eq("project_id", project_id).execute()
+            response = await sb_execute(supabase.table("test_schedules").select("*").eq("project_id", project_id))
 
             return response.data or []
         except Exception as e:
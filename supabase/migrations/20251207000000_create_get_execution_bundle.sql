@@ -0,0 +1,31 @@
+/*
+  # Execution Bundle Function
+
+  1. New Functions
+    - `get_execution_bundle(eid uuid)` - Return an execution together with its
+      test results, bug reports and performance metrics as a single jsonb object
+
+  2. Indexes
+    - `idx_bug_reports_execution` - Support bug report lookups by execution
+
+  3. Notes
+    - Runs with the caller's privileges. The report generator calls it over the
+      direct connection in SUPABASE_DB_URL, which normally uses the `postgres`
+      role. That role owns the tables and bypasses RLS, so these reads are not
+      limited to the caller's projects. Only server-side code should hold that URL.
+*/
+
+CREATE OR REPLACE FUNCTION get_execution_bundle(eid uuid)
+RETURNS jsonb
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT jsonb_build_object(
+    'execution', (SELECT to_jsonb(e) FROM test_executions e WHERE e.id = eid),
+    'results', (SELECT coalesce(jsonb_agg(r), '[]'::jsonb) FROM test_results r WHERE r.execution_id = eid),
+    'bugs', (SELECT coalesce(jsonb_agg(b), '[]'::jsonb) FROM bug_reports b WHERE b.execution_id = eid),
+    'perf', (SELECT coalesce(jsonb_agg(p), '[]'::jsonb) FROM performance_metrics p WHERE p.execution_id = eid)
+  );
+$$;
+
+CREATE INDEX IF NOT EXISTS idx_bug_reports_execution ON bug_reports(execution_id);
@@ -0,0 +1,37 @@
+/*
+  # Scope Execution Bundle to the Project Owner
+
+  1. Changed Functions
+    - `get_execution_bundle(eid uuid, uid uuid)` replaces `get_execution_bundle(eid uuid)`.
+      It returns the bundle only when the execution belongs to a project owned by `uid`.
+      Otherwise every key in the result is empty.
+
+  2. Security
+    - Declared `SECURITY INVOKER`. Callers that go through the Supabase API stay
+      subject to RLS.
+    - The report generator calls it over the direct connection in SUPABASE_DB_URL,
+      which bypasses RLS. The explicit owner filter enforces the same rule as the
+      `test_projects.owner_id = auth.uid()` policies on that path.
+*/
+
+DROP FUNCTION IF EXISTS get_execution_bundle(uuid);
+
+CREATE OR REPLACE FUNCTION get_execution_bundle(eid uuid, uid uuid)
+RETURNS jsonb
+LANGUAGE sql
+STABLE
+SECURITY INVOKER
+AS $$
+  WITH owned AS (
+    SELECT e.*
+    FROM test_executions e
+    JOIN test_projects p ON p.id = e.project_id
+    WHERE e.id = eid AND p.owner_id = uid
+  )
+  SELECT jsonb_build_object(
+    'execution', (SELECT to_jsonb(o) FROM owned o),
+    'results', (SELECT coalesce(jsonb_agg(r), '[]'::jsonb) FROM test_results r WHERE r.execution_id IN (SELECT id FROM owned)),
+    'bugs', (SELECT coalesce(jsonb_agg(b), '[]'::jsonb) FROM bug_reports b WHERE b.execution_id IN (SELECT id FROM owned)),
+    'perf', (SELECT coalesce(jsonb_agg(m), '[]'::jsonb) FROM performance_metrics m WHERE m.execution_id IN (SELECT id FROM owned))
+  );
+$$;
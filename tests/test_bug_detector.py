@@ -0,0 +1,194 @@
+import asyncio
+
+import orjson
+import pytest
+
+import bug_detector
+from bug_detector import (
+    BugDetector,
+    BugReport,
+    BugSeverity,
+    BugType,
+    bug_to_row,
+    network_error_severity,
+    wait_for_settle,
+)
+
+
+def test_wait_for_settle_returns_once_count_is_stable():
+    counts = iter([1, 3, 3])
+    polls = []
+
+    def count():
+        polls.append(1)
+        return next(counts)
+
+    asyncio.run(wait_for_settle(count, interval=0, max_wait=1.0))
+
+    assert len(polls) == 3
+
+
+def test_wait_for_settle_gives_up_at_max_wait():
+    counter = iter(range(1000))
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await wait_for_settle(lambda: next(counter), interval=0.01, max_wait=0.05)
+        return loop.time() - started
+
+    assert asyncio.run(main()) < 0.5
+
+
+def test_network_error_severity():
+    assert network_error_severity(500) is BugSeverity.CRITICAL
+    assert network_error_severity(503) is BugSeverity.CRITICAL
+    assert network_error_severity(404) is BugSeverity.HIGH
+    assert network_error_severity(403) is BugSeverity.MEDIUM
+    assert network_error_severity(400) is BugSeverity.MEDIUM
+
+
+def make_bug(title="Broken image", **overrides):
+    fields = dict(
+        title=title,
+        severity=BugSeverity.HIGH,
+        bug_type=BugType.BROKEN_IMAGE,
+        description="Image failed to load",
+        page_url="https://example.test/",
+        steps_to_reproduce=["Open page", "Look at hero image"],
+        expected_behavior="Image renders",
+        actual_behavior="Image is broken",
+        browser_info={"browser": "chromium"},
+    )
+    fields.update(overrides)
+    return BugReport(**fields)
+
+
+def test_bug_to_row_serializes_enums_and_steps():
+    row = bug_to_row(make_bug(), "proj-1", "exec-1")
+
+    assert row["project_id"] == "proj-1"
+    assert row["execution_id"] == "exec-1"
+    assert row["severity"] == "high"
+    assert row["bug_type"] == "broken_image"
+    assert orjson.loads(row["steps_to_reproduce"]) == ["Open page", "Look at hero image"]
+    assert row["browser_info"] == {"browser": "chromium"}
+    assert row["status"] == "open"
+    assert "screenshot_path" not in row
+
+
+def drain(bugs, monkeypatch, batch_size):
+    monkeypatch.setattr(bug_detector, "BUG_INSERT_BATCH_SIZE", batch_size)
+    detector = BugDetector(None, "https://example.test", "exec-1")
+    batches = []
+
+    async def save(project_id, execution_id, batch):
+        batches.append([bug.title for bug in batch])
+
+    monkeypatch.setattr(detector, "save_bugs_to_database", save)
+
+    async def main():
+        queue = asyncio.Queue()
+        for bug in bugs:
+            queue.put_nowait(bug)
+        queue.put_nowait(None)
+        await detector._drain_bugs_to_database(queue, "proj-1")
+
+    asyncio.run(main())
+    return batches
+
+
+def test_drain_batches_up_to_insert_batch_size(monkeypatch):
+    bugs = [make_bug(title=f"bug-{i}") for i in range(7)]
+
+    batches = drain(bugs, monkeypatch, batch_size=3)
+
+    assert [len(batch) for batch in batches] == [3, 3, 1]
+    assert [title for batch in batches for title in batch] == [bug.title for bug in bugs]
+
+
+def test_drain_stops_at_sentinel_without_empty_insert(monkeypatch):
+    assert drain([], monkeypatch, batch_size=3) == []
+    assert drain([make_bug(), make_bug()], monkeypatch, batch_size=3) == [["Broken image", "Broken image"]]
+
+
+def test_drain_full_batch_before_sentinel_skips_empty_insert(monkeypatch):
+    bugs = [make_bug(title=f"bug-{i}") for i in range(3)]
+
+    batches = drain(bugs, monkeypatch, batch_size=3)
+
+    assert batches == [["bug-0", "bug-1", "bug-2"]]
+
+
+def test_enqueue_raises_drainer_error_instead_of_blocking_on_full_queue():
+    async def main():
+        queue = asyncio.Queue(maxsize=1)
+        queue.put_nowait(make_bug())
+        started = asyncio.Event()
+
+        async def failing_drainer():
+            started.set()
+            await asyncio.sleep(0)
+            raise ValueError("row build failed")
+
+        drainer = asyncio.create_task(failing_drainer())
+        await started.wait()
+        await asyncio.wait_for(BugDetector._enqueue(queue, make_bug(), drainer), timeout=1)
+
+    with pytest.raises(ValueError, match="row build failed"):
+        asyncio.run(main())
+
+
+def test_enqueue_raises_once_drainer_has_exited():
+    async def main():
+        drainer = asyncio.create_task(asyncio.sleep(0))
+        await drainer
+        await BugDetector._enqueue(asyncio.Queue(), None, drainer)
+
+    with pytest.raises(RuntimeError, match="Bug drainer stopped"):
+        asyncio.run(main())
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+class FakeHttpClient:
+    def __init__(self, fail_at=()):
+        self.fail_at = set(fail_at)
+        self.posts = []
+
+    async def post(self, path, content, headers):
+        self.posts.append((path, orjson.loads(content), headers))
+        return FakeResponse(500 if len(self.posts) in self.fail_at else 201)
+
+
+def test_save_bugs_posts_chunks_with_minimal_return(monkeypatch):
+    monkeypatch.setattr(bug_detector, "BUG_INSERT_BATCH_SIZE", 2)
+    client = FakeHttpClient()
+    monkeypatch.setattr(bug_detector, "get_http_client", lambda: client)
+    detector = BugDetector(None, "https://example.test", "exec-1")
+    bugs = [make_bug(title=f"bug-{i}") for i in range(5)]
+
+    asyncio.run(detector.save_bugs_to_database("proj-1", "exec-1", bugs))
+
+    assert [len(rows) for _, rows, _ in client.posts] == [2, 2, 1]
+    assert all(path == "/bug_reports" for path, _, _ in client.posts)
+    assert all(headers == {"Prefer": "return=minimal"} for _, _, headers in client.posts)
+    assert [row["title"] for _, rows, _ in client.posts for row in rows] == [f"bug-{i}" for i in range(5)]
+
+
+def test_failed_chunk_does_not_stop_the_others(monkeypatch):
+    monkeypatch.setattr(bug_detector, "BUG_INSERT_BATCH_SIZE", 2)
+    client = FakeHttpClient(fail_at={1})
+    monkeypatch.setattr(bug_detector, "get_http_client", lambda: client)
+    detector = BugDetector(None, "https://example.test", "exec-1")
+
+    asyncio.run(detector.save_bugs_to_database("proj-1", "exec-1", [make_bug() for _ in range(4)]))
+
+    assert len(client.posts) == 2
@@ -0,0 +1,19 @@
+import asyncio
+
+import db
+
+
+def test_http_client_is_shared_until_closed(monkeypatch):
+    monkeypatch.setattr(db, "_http_client", None)
+
+    client = db.get_http_client()
+    assert db.get_http_client() is client
+    assert str(client.base_url).rstrip("/").endswith("/rest/v1")
+    assert client.headers["Content-Type"] == "application/json"
+
+    asyncio.run(db.close_http_client())
+
+    assert client.is_closed
+    assert db._http_client is None
+    assert db.get_http_client() is not client
+    asyncio.run(db.close_http_client())
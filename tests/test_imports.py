@@ -0,0 +1,11 @@
+import importlib
+
+import pytest
+
+
+@pytest.mark.parametrize(
+    "module",
+    ["db", "bug_detector", "qa_agent", "report_generator", "scheduler", "orchestrator", "example_usage"],
+)
+def test_module_imports(module):
+    importlib.import_module(module)
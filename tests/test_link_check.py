@@ -0,0 +1,210 @@
+import asyncio
+import time
+
+import qa_agent
+from qa_agent import DomainRateLimiter, LinkCheckCache, collect_link_urls, fetch_link_status
+
+
+def test_link_check_cache_expires_after_ttl(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(qa_agent.time, "time", lambda: clock[0])
+    cache = LinkCheckCache(ttl=60)
+    cache.set("https://a.test/", 200)
+
+    clock[0] += 60
+    assert cache.get("https://a.test/") == 200
+
+    clock[0] += 1
+    assert cache.get("https://a.test/") is None
+    assert "https://a.test/" not in cache._d
+
+
+def test_link_check_cache_evicts_least_recently_used():
+    cache = LinkCheckCache(ttl=60, maxsize=2)
+    cache.set("https://a.test/", 200)
+    cache.set("https://b.test/", 200)
+    cache.get("https://a.test/")
+    cache.set("https://c.test/", 301)
+
+    assert len(cache._d) == 2
+    assert cache.get("https://a.test/") == 200
+    assert cache.get("https://b.test/") is None
+    assert cache.get("https://c.test/") == 301
+
+
+def run_requests(limiter, requests):
+    # requests: (url, seconds held inside the slot); returns host -> send times
+    sends = {}
+
+    async def request(url, hold):
+        async with limiter.slot(url):
+            sends.setdefault(url.split("/")[2], []).append(time.monotonic())
+            await asyncio.sleep(hold)
+
+    async def main():
+        await asyncio.gather(*(request(url, hold) for url, hold in requests))
+
+    asyncio.run(main())
+    return sends
+
+
+def assert_spaced(times, gap):
+    # Sleeps never wake early by more than the clock resolution; allow 5ms for that.
+    times = sorted(times)
+    assert all(later - earlier >= gap - 0.005 for earlier, later in zip(times, times[1:]))
+
+
+def test_slot_spaces_sends_per_host_without_blocking_other_hosts():
+    limiter = DomainRateLimiter(min_gap=0.1, per_host=4, concurrency=10)
+
+    sends = run_requests(limiter, [(f"https://a.test/{i}", 0) for i in range(3)] + [("https://b.test/", 0)])
+
+    assert_spaced(sends["a.test"], 0.1)
+    assert sends["b.test"][0] < max(sends["a.test"])
+
+
+def test_slot_enforces_gap_after_waiting_for_a_global_slot():
+    limiter = DomainRateLimiter(min_gap=0.1, per_host=4, concurrency=1)
+
+    sends = run_requests(limiter, [("https://a.test/slow", 0.3), ("https://a.test/1", 0), ("https://a.test/2", 0)])
+
+    assert len(sends["a.test"]) == 3
+    assert_spaced(sends["a.test"], 0.1)
+
+
+def test_slot_caps_requests_in_flight_per_host():
+    limiter = DomainRateLimiter(min_gap=0, per_host=2)
+    in_flight = peak = 0
+
+    async def request():
+        nonlocal in_flight, peak
+        async with limiter.slot("https://a.test/"):
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+
+    async def main():
+        await asyncio.gather(*(request() for _ in range(6)))
+
+    asyncio.run(main())
+
+    assert peak == 2
+
+
+def test_slot_caps_requests_in_flight_globally():
+    limiter = DomainRateLimiter(min_gap=0, per_host=4, concurrency=3)
+    in_flight = peak = 0
+
+    async def request(url):
+        nonlocal in_flight, peak
+        async with limiter.slot(url):
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+
+    async def main():
+        await asyncio.gather(*(request(f"https://host-{i}.test/") for i in range(8)))
+
+    asyncio.run(main())
+
+    assert peak == 3
+
+
+def test_collect_link_urls_normalizes_and_dedupes():
+    hrefs = [
+        "/about",
+        "/about#team",
+        "https://example.test/about",
+        "#top",
+        "",
+        None,
+        "mailto:team@example.test",
+        "javascript:void(0)",
+        "../docs/?q=1#section",
+        "https://other.test/page",
+    ]
+
+    urls = collect_link_urls(hrefs, "https://example.test/blog/post")
+
+    assert urls == {
+        "https://example.test/about": "/about",
+        "https://example.test/docs/?q=1": "../docs/?q=1#section",
+        "https://other.test/page": "https://other.test/page",
+    }
+
+
+class FakeResponse:
+    def __init__(self, status):
+        self.status = status
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeSession:
+    def __init__(self, head_status, get_status=200):
+        self.head_status = head_status
+        self.get_status = get_status
+        self.calls = []
+
+    def head(self, url, **kwargs):
+        self.calls.append(("HEAD", url))
+        return FakeResponse(self.head_status)
+
+    def get(self, url, **kwargs):
+        self.calls.append(("GET", url, kwargs.get("headers")))
+        return FakeResponse(self.get_status)
+
+
+def fresh_head_cache(monkeypatch, ttl=3600):
+    cache = LinkCheckCache(ttl=ttl)
+    monkeypatch.setattr(qa_agent, "head_unsupported_hosts", cache)
+    return cache
+
+
+def test_fetch_link_status_uses_head_when_supported(monkeypatch):
+    cache = fresh_head_cache(monkeypatch)
+    session = FakeSession(head_status=404)
+
+    status = asyncio.run(fetch_link_status(session, "https://a.test/missing"))
+
+    assert status == 404
+    assert session.calls == [("HEAD", "https://a.test/missing")]
+    assert cache.get("a.test") is None
+
+
+def test_fetch_link_status_falls_back_to_ranged_get_and_remembers_host(monkeypatch):
+    cache = fresh_head_cache(monkeypatch)
+    session = FakeSession(head_status=405, get_status=206)
+
+    async def main():
+        first = await fetch_link_status(session, "https://a.test/one")
+        second = await fetch_link_status(session, "https://a.test/two")
+        return first, second
+
+    assert asyncio.run(main()) == (206, 206)
+    assert session.calls == [
+        ("HEAD", "https://a.test/one"),
+        ("GET", "https://a.test/one", {"Range": "bytes=0-0"}),
+        ("GET", "https://a.test/two", {"Range": "bytes=0-0"}),
+    ]
+    assert cache.get("a.test") == 405
+
+
+def test_head_unsupported_hosts_expire(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(qa_agent.time, "time", lambda: clock[0])
+    fresh_head_cache(monkeypatch, ttl=60)
+    session = FakeSession(head_status=501, get_status=200)
+
+    asyncio.run(fetch_link_status(session, "https://a.test/"))
+    clock[0] += 61
+    session.head_status = 200
+    asyncio.run(fetch_link_status(session, "https://a.test/"))
+
+    assert [call[0] for call in session.calls] == ["HEAD", "GET", "HEAD"]
@@ -0,0 +1,154 @@
+import asyncio
+
+import qa_agent
+
+
+class FakeQuery:
+    def __init__(self, log, table, op, payload):
+        self.log = log
+        self.entry = (table, op, payload)
+
+    def eq(self, column, value):
+        self.entry = self.entry + ((column, value),)
+        return self
+
+
+class FakeTable:
+    def __init__(self, log, name):
+        self.log = log
+        self.name = name
+
+    def insert(self, payload, **kwargs):
+        return FakeQuery(self.log, self.name, "insert", payload)
+
+    def update(self, payload, **kwargs):
+        return FakeQuery(self.log, self.name, "update", payload)
+
+
+class FakeClient:
+    def __init__(self, log):
+        self.log = log
+
+    def table(self, name):
+        return FakeTable(self.log, name)
+
+
+class FakePage:
+    async def goto(self, url, **kwargs):
+        self.url = url
+
+
+class FakeContext:
+    def __init__(self):
+        self.closed = False
+
+    async def new_page(self):
+        return FakePage()
+
+    async def close(self):
+        self.closed = True
+
+
+def make_runner(status, wait_for=None):
+    class Runner:
+        def __init__(self, page, base_url):
+            self.page = page
+
+        async def run(self):
+            if wait_for is not None:
+                await wait_for.wait()
+            return qa_agent.TestResult(status=status, message="done", duration_ms=1, details={})
+
+    return Runner
+
+
+def test_results_are_persisted_as_each_runner_finishes(monkeypatch):
+    writes = []
+    context = FakeContext()
+
+    async def main():
+        first_result_saved = asyncio.Event()
+
+        async def fake_sb_execute(query):
+            writes.append(query.entry)
+            if query.entry[0] == "test_results":
+                first_result_saved.set()
+
+        async def new_context():
+            return context
+
+        monkeypatch.setattr(qa_agent, "get_supabase", lambda: FakeClient(writes))
+        monkeypatch.setattr(qa_agent, "sb_execute", fake_sb_execute)
+        monkeypatch.setitem(qa_agent.TEST_RUNNERS, qa_agent.TestType.FUNCTIONAL, make_runner(qa_agent.TestStatus.PASSED))
+        # This runner only finishes once the first result has been written, so the
+        # suite deadlocks (and times out) if results are only saved at the end.
+        monkeypatch.setitem(
+            qa_agent.TEST_RUNNERS,
+            qa_agent.TestType.ACCESSIBILITY,
+            make_runner(qa_agent.TestStatus.WARNING, wait_for=first_result_saved),
+        )
+
+        agent = qa_agent.QAAgent("user-1")
+        monkeypatch.setattr(agent, "new_context", new_context)
+        return await asyncio.wait_for(
+            agent.run_test_suite(
+                "proj-1", "https://example.test", [qa_agent.TestType.FUNCTIONAL, qa_agent.TestType.ACCESSIBILITY]
+            ),
+            timeout=2,
+        )
+
+    execution = asyncio.run(main())
+
+    assert [(table, op) for table, op, *_ in writes] == [
+        ("test_executions", "insert"),
+        ("test_results", "insert"),
+        ("test_results", "insert"),
+        ("test_executions", "update"),
+    ]
+    assert [writes[1][2]["status"], writes[2][2]["status"]] == ["passed", "warning"]
+    assert {writes[1][2]["execution_id"], writes[2][2]["execution_id"]} == {execution["id"]}
+    assert writes[3][2]["status"] == "completed"
+    assert (execution["passed"], execution["warnings"], execution["total_tests"]) == (1, 1, 2)
+    assert context.closed
+
+
+def test_cancelled_suite_marks_execution_failed(monkeypatch):
+    writes = []
+
+    async def main():
+        runner_started = asyncio.Event()
+
+        async def fake_sb_execute(query):
+            writes.append(query.entry)
+
+        async def new_context():
+            return FakeContext()
+
+        class HangingRunner:
+            def __init__(self, page, base_url):
+                pass
+
+            async def run(self):
+                runner_started.set()
+                await asyncio.sleep(60)
+
+        monkeypatch.setattr(qa_agent, "get_supabase", lambda: FakeClient(writes))
+        monkeypatch.setattr(qa_agent, "sb_execute", fake_sb_execute)
+        monkeypatch.setitem(qa_agent.TEST_RUNNERS, qa_agent.TestType.FUNCTIONAL, HangingRunner)
+
+        agent = qa_agent.QAAgent("user-1")
+        monkeypatch.setattr(agent, "new_context", new_context)
+        suite = asyncio.create_task(
+            agent.run_test_suite("proj-1", "https://example.test", [qa_agent.TestType.FUNCTIONAL])
+        )
+        await runner_started.wait()
+        suite.cancel()
+        await asyncio.gather(suite, return_exceptions=True)
+        return suite
+
+    suite = asyncio.run(main())
+
+    assert suite.cancelled()
+    table, op, payload, (column, execution_id) = writes[-1]
+    assert (table, op, payload["status"], column) == ("test_executions", "update", "failed", "id")
+    assert execution_id == writes[0][2]["id"]
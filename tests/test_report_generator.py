@@ -0,0 +1,205 @@
+import asyncio
+
+import asyncpg
+import orjson
+
+import report_generator
+from report_generator import ReportCache, ReportFormat, ReportGenerator
+
+
+def make_generator(bugs=None, results=None):
+    generator = ReportGenerator("exec-1", "proj-1", "user-1")
+    generator.execution_data = {"id": "exec-1", "status": "completed"}
+    generator.bug_reports = bugs or []
+    generator.test_results = results or []
+    return generator
+
+
+def test_bug_summary_maps_missing_bug_type_to_unknown():
+    generator = make_generator(bugs=[
+        {"severity": "high", "bug_type": None},
+        {"severity": "low"},
+        {"severity": "low", "bug_type": "console_error"},
+    ])
+
+    summary = generator.generate_bug_summary()
+
+    assert summary["type_breakdown"] == {"unknown": 2, "console_error": 1}
+
+
+def test_json_report_handles_null_bug_type():
+    generator = make_generator(bugs=[{"severity": "high", "bug_type": None}])
+
+    report = orjson.loads(generator.generate_json_report())
+
+    assert report["bug_summary"]["type_breakdown"] == {"unknown": 1}
+
+
+def test_stream_json_frames_a_valid_document():
+    generator = make_generator(
+        bugs=[{"severity": "high", "bug_type": None}, {"severity": "low", "bug_type": "network_error"}],
+        results=[{"test_type": "performance", "status": "passed"}],
+    )
+
+    report = orjson.loads(b"".join(generator.stream_json()))
+
+    assert report["bug_summary"]["total_bugs"] == 2
+    assert report["bug_summary"]["type_breakdown"] == {"unknown": 1, "network_error": 1}
+    assert [bug["severity"] for bug in report["bug_summary"]["bugs"]] == ["high", "low"]
+    assert report["test_results"] == [{"test_type": "performance", "status": "passed"}]
+    assert set(report) == {"execution_summary", "bug_summary", "performance_summary", "test_results", "generated_at"}
+
+
+def test_stream_json_frames_empty_arrays():
+    report = orjson.loads(b"".join(make_generator().stream_json()))
+
+    assert report["bug_summary"]["bugs"] == []
+    assert report["test_results"] == []
+
+
+def test_report_cache_misses_when_version_changes():
+    cache = ReportCache(ttl=60)
+    cache.set("exec-1", ReportFormat.JSON, "report", ("completed", 0, None))
+
+    assert cache.get("exec-1", ReportFormat.JSON, ("completed", 0, None)) == "report"
+    assert cache.get("exec-1", ReportFormat.JSON, ("completed", 3, "2025-12-07")) is None
+    assert cache.get("exec-1", ReportFormat.JSON, ("completed", 0, None)) is None
+
+
+def test_report_cache_expires_after_ttl(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(report_generator.time, "time", lambda: clock[0])
+    cache = ReportCache(ttl=60)
+    cache.set("exec-1", ReportFormat.HTML, "<html></html>", ("completed", 0, None))
+
+    clock[0] += 60
+    assert cache.get("exec-1", ReportFormat.HTML, ("completed", 0, None)) == "<html></html>"
+    assert cache.get("exec-1", ReportFormat.JSON, ("completed", 0, None)) is None
+
+    clock[0] += 1
+    assert cache.get("exec-1", ReportFormat.HTML, ("completed", 0, None)) is None
+
+
+def test_report_cache_is_bounded():
+    version = ("completed", 0, None)
+    cache = ReportCache(ttl=60, maxsize=3)
+    for idx in range(10):
+        cache.set(f"exec-{idx}", ReportFormat.JSON, f"report-{idx}", version)
+
+    assert len(cache._d) == 3
+    assert cache.get("exec-6", ReportFormat.JSON, version) is None
+    assert cache.get("exec-9", ReportFormat.JSON, version) == "report-9"
+
+
+def test_report_cache_evicts_least_recently_used():
+    version = ("completed", 0, None)
+    cache = ReportCache(ttl=60, maxsize=2)
+    cache.set("exec-1", ReportFormat.JSON, "one", version)
+    cache.set("exec-2", ReportFormat.JSON, "two", version)
+    cache.get("exec-1", ReportFormat.JSON, version)
+    cache.set("exec-3", ReportFormat.JSON, "three", version)
+
+    assert cache.get("exec-1", ReportFormat.JSON, version) == "one"
+    assert cache.get("exec-2", ReportFormat.JSON, version) is None
+
+
+class FakeBundlePool:
+    def __init__(self, installed=True):
+        self.installed = installed
+        self.calls = []
+
+    async def fetchval(self, query, *args):
+        self.calls.append((query, args))
+        if "get_execution_bundle" in query and not self.installed:
+            raise asyncpg.UndefinedFunctionError("function get_execution_bundle does not exist")
+        return {"execution": {"id": "exec-1"}, "results": [], "bugs": [{"severity": "low"}], "perf": None}
+
+    async def fetchrow(self, query, *args):
+        self.calls.append((query, args))
+        return None
+
+
+def use_pool(monkeypatch, pool):
+    async def get_pool():
+        return pool
+
+    monkeypatch.setattr(report_generator, "get_pool", get_pool)
+
+
+def test_bundle_is_loaded_for_the_requesting_owner(monkeypatch):
+    pool = FakeBundlePool()
+    use_pool(monkeypatch, pool)
+    generator = ReportGenerator("exec-1", "proj-1", "user-1")
+
+    asyncio.run(generator.load_all_data())
+
+    assert pool.calls == [("SELECT get_execution_bundle($1, $2)", ("exec-1", "user-1"))]
+    assert generator.bug_reports == [{"severity": "low"}]
+    assert generator.performance_metrics == []
+
+
+def test_inline_bundle_fallback_filters_by_owner(monkeypatch):
+    pool = FakeBundlePool(installed=False)
+    use_pool(monkeypatch, pool)
+    generator = ReportGenerator("exec-1", "proj-1", "user-1")
+
+    asyncio.run(generator.load_all_data())
+
+    query, args = pool.calls[-1]
+    assert query == report_generator.EXECUTION_BUNDLE_SQL
+    assert args == ("exec-1", "user-1")
+    assert "p.owner_id = $2" in query
+    assert generator.execution_data == {"id": "exec-1"}
+
+
+def test_report_version_filters_by_owner(monkeypatch):
+    pool = FakeBundlePool()
+    use_pool(monkeypatch, pool)
+    generator = ReportGenerator("exec-1", "proj-1", "user-1")
+
+    assert asyncio.run(generator.load_report_version()) is None
+    assert pool.calls == [(report_generator.REPORT_VERSION_SQL, ("exec-1", "user-1"))]
+    assert "p.owner_id = $2" in report_generator.REPORT_VERSION_SQL
+
+
+def test_bytecode_cache_uses_the_configured_directory(monkeypatch, tmp_path):
+    cache_dir = tmp_path / "jinja"
+    monkeypatch.setattr(report_generator, "TEMPLATE_CACHE_DIR", str(cache_dir))
+
+    cache = report_generator._bytecode_cache()
+
+    assert cache is not None and cache.directory == str(cache_dir)
+    assert cache_dir.is_dir()
+
+
+def test_bytecode_cache_falls_back_to_none_when_unusable(monkeypatch, tmp_path):
+    blocker = tmp_path / "not-a-dir"
+    blocker.write_text("")
+    monkeypatch.setattr(report_generator, "TEMPLATE_CACHE_DIR", str(blocker))
+
+    assert report_generator._bytecode_cache() is None
+
+
+def test_html_report_escapes_bug_fields():
+    generator = make_generator(bugs=[{
+        "severity": "high",
+        "title": "<script>alert(1)</script>",
+        "description": "a & b",
+    }])
+
+    html = generator.generate_html_report()
+
+    assert "<script>alert(1)</script>" not in html
+    assert "&lt;script&gt;alert(1)&lt;/script&gt;" in html
+    assert "a &amp; b" in html
+
+
+def test_html_report_lists_at_most_html_bug_limit_bugs():
+    limit = report_generator.HTML_BUG_LIMIT
+    generator = make_generator(bugs=[{"severity": "low", "title": f"bug-{i}"} for i in range(limit + 5)])
+
+    html = generator.generate_html_report()
+
+    assert html.count('class="bug-title"') == limit
+    assert f"bug-{limit - 1}<" in html
+    assert f"bug-{limit}<" not in html
@@ -0,0 +1,300 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from croniter import croniter
+
+import db
+import scheduler
+from scheduler import ScheduledTask
+
+
+def make_task(task_id="task-1", cron_expression="*/5 * * * *", next_run=None):
+    return ScheduledTask(
+        id=task_id,
+        project_id="proj-1",
+        name=task_id,
+        cron_expression=cron_expression,
+        enabled=True,
+        last_run=None,
+        next_run=next_run,
+        base_url="https://example.test",
+    )
+
+
+def test_stop_waits_for_runs_then_cancels_stragglers_before_final_flush(monkeypatch):
+    monkeypatch.setattr(scheduler, "STOP_TIMEOUT", 0.1)
+    flushes = []
+
+    async def main():
+        test_scheduler = scheduler.TestScheduler()
+
+        async def flush():
+            still_running = any(not task.done() for task in test_scheduler._running_tasks)
+            flushes.append((still_running, dict(test_scheduler._pending_updates)))
+
+        monkeypatch.setattr(test_scheduler, "flush_schedule_updates", flush)
+
+        async def quick_run():
+            await asyncio.sleep(0.01)
+            await test_scheduler.update_schedule_in_database("quick", "last", "next")
+
+        async def stuck_run():
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                await test_scheduler.update_schedule_in_database("stuck", "last", "next")
+                raise
+
+        runs = [asyncio.create_task(quick_run()), asyncio.create_task(stuck_run())]
+        for run in runs:
+            test_scheduler._running_tasks.add(run)
+            run.add_done_callback(test_scheduler._running_tasks.discard)
+
+        await test_scheduler.stop()
+        return runs
+
+    quick, stuck = asyncio.run(main())
+
+    assert quick.done() and not quick.cancelled()
+    assert stuck.cancelled()
+    assert flushes == [(False, {"quick": ("last", "next"), "stuck": ("last", "next")})]
+
+
+def run_loop(test_scheduler, monkeypatch, settle=0.05):
+    async def no_schedules():
+        return None
+
+    monkeypatch.setattr(test_scheduler, "load_schedules_from_database", no_schedules)
+
+    async def main():
+        test_scheduler.running = True
+        loop_task = asyncio.create_task(test_scheduler.scheduler_loop())
+        await asyncio.sleep(settle)
+        test_scheduler.running = False
+        test_scheduler._wakeup.set()
+        await loop_task
+        await asyncio.gather(*test_scheduler._running_tasks)
+
+    asyncio.run(main())
+
+
+def recording_execute(executed, advance=True):
+    async def execute(task):
+        executed.append(task.id)
+        if advance:
+            task.next_run = datetime.now(timezone.utc) + timedelta(hours=1)
+
+    return execute
+
+
+def test_rescheduling_supersedes_the_older_heap_entry(monkeypatch):
+    test_scheduler = scheduler.TestScheduler()
+    executed = []
+    test_scheduler.execute_task = recording_execute(executed)
+    task = make_task()
+    test_scheduler.tasks[task.id] = task
+
+    now = time.time()
+    test_scheduler._schedule(task, now - 2)
+    test_scheduler._schedule(task, now - 1)
+    run_loop(test_scheduler, monkeypatch)
+
+    assert executed == ["task-1"]
+    assert test_scheduler._scheduled_at[task.id] == task.next_run.timestamp()
+
+
+def test_heap_runs_due_tasks_in_order_and_leaves_future_ones(monkeypatch):
+    test_scheduler = scheduler.TestScheduler()
+    executed = []
+    test_scheduler.execute_task = recording_execute(executed)
+    now = time.time()
+    for task_id, when in (("late", now - 1), ("early", now - 5), ("future", now + 3600)):
+        task = make_task(task_id)
+        test_scheduler.tasks[task_id] = task
+        test_scheduler._schedule(task, when)
+
+    run_loop(test_scheduler, monkeypatch)
+
+    assert executed == ["early", "late"]
+    assert test_scheduler._scheduled_at["future"] == now + 3600
+
+
+def test_disabled_schedule_is_not_run(monkeypatch):
+    async def fake_sb_execute(query):
+        return None
+
+    monkeypatch.setattr(scheduler, "sb_execute", fake_sb_execute)
+
+    test_scheduler = scheduler.TestScheduler()
+    executed = []
+    test_scheduler.execute_task = recording_execute(executed)
+    task = make_task()
+    test_scheduler.tasks[task.id] = task
+    test_scheduler._schedule(task, time.time() - 1)
+
+    asyncio.run(test_scheduler.disable_schedule(task.id))
+    run_loop(test_scheduler, monkeypatch)
+
+    assert executed == []
+    assert not task.enabled
+    assert task.id not in test_scheduler._scheduled_at
+
+
+def test_failed_run_is_retried_after_retry_delay():
+    test_scheduler = scheduler.TestScheduler()
+    executed = []
+    test_scheduler.execute_task = recording_execute(executed, advance=False)
+    task = make_task(next_run=datetime.now(timezone.utc) - timedelta(minutes=1))
+
+    before = time.time()
+    asyncio.run(test_scheduler._run_task(task))
+
+    retry_at = test_scheduler._scheduled_at[task.id]
+    assert executed == ["task-1"]
+    assert before + scheduler.RETRY_DELAY <= retry_at <= time.time() + scheduler.RETRY_DELAY
+
+
+def test_successful_run_is_scheduled_at_next_run():
+    test_scheduler = scheduler.TestScheduler()
+    test_scheduler.execute_task = recording_execute([])
+    task = make_task(next_run=datetime.now(timezone.utc) - timedelta(minutes=1))
+
+    asyncio.run(test_scheduler._run_task(task))
+
+    assert test_scheduler._scheduled_at[task.id] == task.next_run.timestamp()
+
+
+def test_next_run_resets_a_stale_cron_iterator():
+    test_scheduler = scheduler.TestScheduler()
+    task = make_task(cron_expression="* * * * *")
+    test_scheduler._cron[task.id] = (task.cron_expression, croniter(task.cron_expression, datetime.now(timezone.utc) - timedelta(days=1)))
+
+    now = datetime.now(timezone.utc)
+    next_run = test_scheduler.calculate_next_run(task)
+
+    assert now < next_run <= now + timedelta(minutes=1)
+
+
+def test_next_run_rebuilds_iterator_when_expression_changes():
+    test_scheduler = scheduler.TestScheduler()
+    task = make_task(cron_expression="* * * * *")
+    test_scheduler.calculate_next_run(task)
+
+    task.cron_expression = "0 0 * * *"
+    next_run = test_scheduler.calculate_next_run(task)
+
+    assert (next_run.hour, next_run.minute) == (0, 0)
+    assert next_run > datetime.now(timezone.utc)
+
+
+class FakePool:
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    async def fetch(self, query, *args):
+        self.queries.append((query, args))
+        return self.rows
+
+
+def test_schedules_are_loaded_through_the_pool(monkeypatch):
+    next_run = datetime.now(timezone.utc) + timedelta(minutes=5)
+    pool = FakePool([{
+        "id": "sched-1",
+        "project_id": "proj-1",
+        "name": "nightly",
+        "cron_expression": "0 0 * * *",
+        "enabled": True,
+        "last_run": None,
+        "next_run": next_run,
+        "base_url": "https://example.test",
+    }])
+
+    async def get_pool():
+        return pool
+
+    monkeypatch.setattr(scheduler, "get_pool", get_pool)
+    test_scheduler = scheduler.TestScheduler()
+
+    asyncio.run(test_scheduler.load_schedules_from_database())
+
+    task = test_scheduler.tasks["sched-1"]
+    assert task.base_url == "https://example.test"
+    assert test_scheduler._heap == [(next_run.timestamp(), "sched-1")]
+    assert len(pool.queries) == 1
+
+
+def test_start_fails_fast_without_a_database_url(monkeypatch):
+    monkeypatch.setattr(db, "SUPABASE_DB_URL", None)
+    monkeypatch.setattr(db, "_pool", None)
+    test_scheduler = scheduler.TestScheduler()
+
+    async def runner(**kwargs):
+        return None
+
+    with pytest.raises(RuntimeError, match="SUPABASE_DB_URL"):
+        asyncio.run(test_scheduler.start(test_runner_callback=runner))
+
+    assert not test_scheduler.running
+    assert test_scheduler._flusher is None
+
+
+class FailingPool:
+    def __init__(self, scheduler_under_test):
+        self.scheduler_under_test = scheduler_under_test
+        self.batches = []
+
+    async def executemany(self, query, rows):
+        self.batches.append(rows)
+        # A run finishing mid-flush queues a newer update for one of the tasks
+        await self.scheduler_under_test.update_schedule_in_database("a", "last-a2", "next-a2")
+        raise ConnectionError("connection reset")
+
+
+def test_failed_flush_requeues_without_overwriting_newer_updates(monkeypatch):
+    test_scheduler = scheduler.TestScheduler()
+    pool = FailingPool(test_scheduler)
+
+    async def get_pool():
+        return pool
+
+    monkeypatch.setattr(scheduler, "get_pool", get_pool)
+
+    async def main():
+        await test_scheduler.update_schedule_in_database("a", "last-a1", "next-a1")
+        await test_scheduler.update_schedule_in_database("b", "last-b1", "next-b1")
+        await test_scheduler.flush_schedule_updates()
+
+    asyncio.run(main())
+
+    assert pool.batches == [[("last-a1", "next-a1", "a"), ("last-b1", "next-b1", "b")]]
+    assert test_scheduler._pending_updates == {
+        "a": ("last-a2", "next-a2"),
+        "b": ("last-b1", "next-b1"),
+    }
+
+
+def test_flush_writes_pending_updates_in_one_batch(monkeypatch):
+    batches = []
+
+    class Pool:
+        async def executemany(self, query, rows):
+            batches.append(rows)
+
+    async def get_pool():
+        return Pool()
+
+    monkeypatch.setattr(scheduler, "get_pool", get_pool)
+    test_scheduler = scheduler.TestScheduler()
+
+    async def main():
+        await test_scheduler.update_schedule_in_database("a", "last-a1", "next-a1")
+        await test_scheduler.update_schedule_in_database("a", "last-a2", "next-a2")
+        await test_scheduler.flush_schedule_updates()
+
+    asyncio.run(main())
+
+    assert batches == [[("last-a2", "next-a2", "a")]]
+    assert test_scheduler._pending_updates == {}